@@ -0,0 +1,83 @@
+"""Time and peak memory of combining per-season frames in driver().
+
+Compares the old loop, which called pd.concat once per season and copied
+every accumulated row each time, with the current single concat over the
+season generator. Run from the repository root:
+
+    python -m benchmarks.bench_driver
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks import synthetic
+from scrapers.sportsbookreview import MLBOddsScraper
+
+
+class _Frames(MLBOddsScraper):
+    # serves prebuilt season frames so only the combining step is measured
+    def __init__(self, seasons, frames):
+        super().__init__(seasons)
+        self.frames = frames
+
+    def _download(self, seasons, return_exceptions=False):
+        return [None] * len(seasons)
+
+    def _season_schema(self, content, season):
+        # (games, report) like OddsScraper._season_schema, with nothing to report
+        report = {
+            "unmapped": [],
+            "cleaned": {},
+            "warnings": {},
+            "quarantine": pd.DataFrame(columns=[*self.schema, "reason", "dropped", "page_row"]),
+            "spans": [],
+        }
+        return self.frames[season], report
+
+
+def legacy_driver(scraper):
+    df = pd.DataFrame()
+    for _, frame in scraper.iter_seasons():
+        df = pd.concat([df, frame], axis=0)
+    return df.reset_index(drop=True)
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=2400)
+    parser.add_argument("--seasons", type=int, nargs="+", default=[1, 5, 15])
+    args = parser.parse_args()
+
+    all_seasons = list(range(2007, 2007 + max(args.seasons)))
+    base = MLBOddsScraper(all_seasons)
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = {
+            s: base._to_schema(base._reformat_data(synthetic.mlb_table(s, args.games)[1:], s))
+            for s in all_seasons
+        }
+
+    for n in args.seasons:
+        scraper = _Frames(all_seasons[:n], frames)
+        old, t_old, m_old = _measure(lambda: legacy_driver(scraper))
+        new, t_new, m_new = _measure(scraper.driver)
+        pd.testing.assert_frame_equal(old, new)
+        print(f"{n:>2} seasons: per-season concat {t_old:.3f}s {m_old:.1f} MiB  "
+              f"single concat {t_new:.3f}s {m_new:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
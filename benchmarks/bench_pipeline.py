@@ -0,0 +1,158 @@
+"""Stage-by-stage benchmark of the whole scrape pipeline.
+
+Serves the fixtures in benchmarks/fixtures from a local server and, for
+every sport/season case, times fetch, parse, reformat, pair, validate and write
+separately. Each case runs in a fresh process, so its peak RSS is its own. Results are saved as JSON so
+runs on different commits can be compared:
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<commit>.json
+"""
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.server import serve
+from scrapers.fetch import Fetcher
+from scrapers.output import SeasonWriter, output_path
+from scrapers.sportsbookreview import OddsScraper
+
+RESULTS = os.path.join(os.path.dirname(__file__), "results")
+STAGES = ("fetch", "parse", "reformat", "pair", "validate", "write")
+
+
+def _peak_rss_mb():
+    # high-water mark of this whole process; ru_maxrss is in KiB on Linux
+    # and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if platform.system() == "Darwin" else peak / 2**10
+
+
+def _commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _formats():
+    formats = ["json", "csv"]
+    if importlib.util.find_spec("pyarrow"):
+        formats.append("parquet")
+    return formats
+
+
+def run_case(sport, season, base, out_dir, repeat):
+    fetcher = Fetcher(interval=0)
+    scraper = OddsScraper(sport, [season], fetcher=fetcher)
+    # keep the file name prefix of the real url, swap the host for the stub
+    scraper.base = f"{base}{sport}/" + scraper.base.rsplit("/", 1)[-1]
+    url = scraper._season_url(season)
+    timings = {stage: float("inf") for stage in STAGES}
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = fetcher.get(url).content
+        timings["fetch"] = min(timings["fetch"], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        raw = scraper._read(content)
+        timings["parse"] = min(timings["parse"], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        df = scraper._reformat_data(raw[1:], season)
+        timings["reformat"] = min(timings["reformat"], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        games = scraper._to_schema(df)
+        timings["pair"] = min(timings["pair"], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        games, quarantine, _ = scraper._validate(df, games)
+        timings["validate"] = min(timings["validate"], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for fmt in _formats():
+            path = output_path(f"{sport}-{season}", fmt).replace("data", out_dir, 1)
+            with SeasonWriter(path, fmt, sport, scraper.dtypes) as writer:
+                writer.write(games)
+        timings["write"] = min(timings["write"], time.perf_counter() - start)
+
+    return {
+        "bytes": len(content),
+        "games": len(games),
+        "quarantined": len(quarantine),
+        "seconds": timings,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def compare(current, baseline):
+    print(f"\ncompared with {baseline['commit']} (ratio < 1 is faster):")
+    for case, result in current["cases"].items():
+        old = baseline["cases"].get(case)
+        if old is None:
+            continue
+        ratios = "  ".join(
+            f"{stage} {result['seconds'][stage] / old['seconds'][stage]:.2f}"
+            for stage in STAGES
+            if old["seconds"].get(stage)
+        )
+        print(f"{case:>9}: {ratios}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, help="results file (default results/<commit>.json)")
+    parser.add_argument("--compare", type=str, help="earlier results file to compare with")
+    args = parser.parse_args()
+
+    fixtures.generate()
+    commit = _commit()
+    results = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "formats": _formats(),
+        "cases": {},
+    }
+    # spawned rather than forked, so a case doesn't start out with the peak
+    # RSS of the parent or of earlier cases
+    spawn = multiprocessing.get_context("spawn")
+    with serve(fixtures.FIXTURES) as base, tempfile.TemporaryDirectory() as out_dir:
+        for sport, season, _ in fixtures.CASES:
+            with ProcessPoolExecutor(1, mp_context=spawn) as pool:
+                result = pool.submit(run_case, sport, season, base, out_dir, args.repeat).result()
+            results["cases"][f"{sport}-{season}"] = result
+            stages = "  ".join(f"{s} {result['seconds'][s] * 1000:7.1f}ms" for s in STAGES)
+            print(f"{sport}-{season}: {result['games']:>5} games  {stages}  "
+                  f"peak rss {result['peak_rss_mb']} MiB")
+
+    os.makedirs(RESULTS, exist_ok=True)
+    path = args.output or os.path.join(RESULTS, f"{commit}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"saved results to {path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cold start cost of cli.py commands, measured with ``-X importtime``.
+
+Each command runs in a fresh interpreter; the script reports the median
+wall time, the total import time and whether pandas got imported. Importing
+the scraper module itself is included as the cost every command paid before
+imports became lazy:
+
+    python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY = ("pandas", "numpy", "requests")
+
+
+def _commands(cache_root):
+    return {
+        "cli.py --help": ["cli.py", "--help"],
+        "cli.py scrape --help": ["cli.py", "scrape", "--help"],
+        "cli.py cache stats": ["cli.py", "cache", "stats", "--root", cache_root],
+        "import scrapers.sportsbookreview": ["-c", "import scrapers.sportsbookreview"],
+    }
+
+
+def _import_times(stderr):
+    # top level entries of -X importtime: "import time: self | cumulative | name"
+    total = 0
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            total += int(cumulative)
+        loaded.add(name.strip().split(".")[0])
+    return total, loaded
+
+
+def run(argv, repeat):
+    walls = []
+    imports = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", *argv], capture_output=True, text=True, check=True
+        )
+        walls.append(time.perf_counter() - start)
+        total, loaded = _import_times(out.stderr)
+        imports.append(total)
+    return statistics.median(walls), statistics.median(imports), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_root:
+        for label, argv in _commands(cache_root).items():
+            wall, imports, loaded = run(argv, args.repeat)
+            heavy = ", ".join(m for m in HEAVY if m in loaded) or "none"
+            print(f"{label:>34}: {wall * 1000:7.1f}ms wall  {imports / 1000:7.1f}ms imports  "
+                  f"heavy: {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Compare the vectorized _to_schema against the original row loops.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_to_schema
+"""
+import argparse
+import contextlib
+import io
+import time
+from itertools import tee
+
+import pandas as pd
+
+from benchmarks import synthetic
+from scrapers.sportsbookreview import NFLOddsScraper, NHLOddsScraper, MLBOddsScraper
+
+
+def _pairwise(iterable):
+    a, b = tee(iterable)
+    next(b, None)
+    return zip(a, b)
+
+
+# The loops below are the row-at-a-time implementations the vectorized
+# versions replaced, kept here as the reference for output and timing. They
+# pair rows (0, 1), (2, 3), ... like the current engine.
+
+def legacy_nfl(self, df):
+    new_df = {k: [] for k in self.schema}
+    df = df.fillna(0).reset_index(drop=True)
+    for (i1, row), (i2, next_row) in _pairwise(df.iterrows()):
+        if i1 % 2 == 1:
+            continue
+        home_ml = int(next_row["close_ml"])
+        away_ml = int(row["close_ml"])
+        odds1 = float(row["open_odds"])
+        odds2 = float(next_row["open_odds"])
+        if odds1 < odds2:
+            open_spread, S_cl_line, h2_spread = odds1, float(row["close_odds"]), float(row["2H_odds"])
+            h2_total, open_ou, close_ou = float(next_row["2H_odds"]), odds2, float(next_row["close_odds"])
+        else:
+            open_spread, S_cl_line, h2_spread = odds2, float(next_row["close_odds"]), float(next_row["2H_odds"])
+            h2_total, open_ou, close_ou = float(row["2H_odds"]), odds1, float(row["close_odds"])
+        home_open_spread = -open_spread if home_ml < away_ml else open_spread
+        S_H_cl_line = -S_cl_line if home_ml < away_ml else S_cl_line
+        h2_home_spread = -h2_spread if home_ml < away_ml else h2_spread
+        values = [row["season"], row["date"], self._translate(next_row["name"]),
+                  self._translate(row["name"])]
+        for q in ("1stQtr", "2ndQtr", "3rdQtr", "4thQtr", "final"):
+            values += [next_row[q], row[q]]
+        values += [home_ml, away_ml, home_open_spread, -home_open_spread, S_H_cl_line,
+                   -S_H_cl_line, h2_home_spread, -h2_home_spread, h2_total, open_ou, close_ou]
+        for k, v in zip(self.schema, values):
+            new_df[k].append(v)
+    return pd.DataFrame(new_df)
+
+
+def legacy_nhl(self, df):
+    new_df = {k: [] for k in self.schema}
+    df = df.fillna(0).reset_index(drop=True)
+    for (i1, row), (i2, next_row) in _pairwise(df.iterrows()):
+        if i1 % 2 == 1:
+            continue
+        values = [row["season"], row["date"], self._translate(next_row["name"]),
+                  self._translate(row["name"])]
+        for p in ("1stPeriod", "2ndPeriod", "3rdPeriod", "final"):
+            values += [next_row[p], row[p]]
+        for ml in ("open_ml", "close_ml"):
+            values += [int(next_row[ml]), int(row[ml])]
+        values += [next_row["S_cl_line"], row["S_cl_line"], next_row["S_cl_odds"], row["S_cl_odds"],
+                   next_row["OU_op_line"], next_row["OU_op_odds"], next_row["OU_cl_line"],
+                   next_row["OU_cl_odds"]]
+        for k, v in zip(self.schema, values):
+            new_df[k].append(v)
+    return pd.DataFrame(new_df)
+
+
+def legacy_mlb(self, df):
+    new_df = {k: [] for k in self.schema}
+    df = df.reset_index(drop=True)
+    for i in range(0, len(df) - 1, 2):
+        row = df.loc[i]
+        next_row = df.loc[i + 1]
+        values = [row["season"], row["date"], self._translate(row["team"]),
+                  self._translate(next_row["team"]), row["final"], next_row["final"],
+                  row["pName"], row["pThrow"], next_row["pName"], next_row["pThrow"]]
+        values += [row[f"{n}Inn"] for n in ("1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th")]
+        values += [next_row[f"{n}Inn"] for n in ("1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th")]
+        values += [row["open_ml"], next_row["open_ml"], row["close_ml"], next_row["close_ml"],
+                   row["S_cl_line"], row["S_cl_odds"], next_row["S_cl_line"], next_row["S_cl_odds"],
+                   row["OU_op_line"], row["OU_op_odds"], next_row["OU_op_odds"],
+                   row["OU_cl_line"], row["OU_cl_odds"], next_row["OU_cl_odds"]]
+        for k, v in zip(self.schema, values):
+            new_df[k].append(v)
+    return pd.DataFrame(new_df)
+
+
+SPORTS = {
+    "nfl": (NFLOddsScraper, synthetic.nfl_table, legacy_nfl),
+    "nhl": (NHLOddsScraper, synthetic.nhl_table, legacy_nhl),
+    "mlb": (MLBOddsScraper, synthetic.mlb_table, legacy_mlb),
+}
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=15)
+    parser.add_argument("--games", type=int, default=1200)
+    args = parser.parse_args()
+
+    seasons = list(range(2007, 2007 + args.seasons))
+    for sport, (cls, table, legacy) in SPORTS.items():
+        scraper = cls(seasons)
+        df = scraper._reformat_data(table(seasons[0], args.games * len(seasons))[1:], seasons[0])
+
+        old, t_old = _timed(legacy, scraper, df)
+        new, t_new = _timed(scraper._to_schema, df)
+        pd.testing.assert_frame_equal(old, new)
+        print(f"{sport}: {len(df)} rows  loop {t_old:.3f}s  vectorized {t_new:.3f}s  "
+              f"({t_old / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Season page fixtures for the pipeline benchmark.
+
+Fixtures live in benchmarks/fixtures/<sport>/ named exactly like the files
+on sportsbookreviewsonline.com, so a local server can stand in for the site.
+They are either generated from the synthetic tables or recorded from the
+raw page cache of a real run:
+
+    python -m benchmarks.fixtures                 # generate
+    python -m benchmarks.fixtures --record data/src
+"""
+import argparse
+import os
+
+from benchmarks import synthetic
+from scrapers.cache import RawCache
+from scrapers.sportsbookreview import OddsScraper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# (sport, season, games): both column layouts of each sport plus the 2020
+# NHL season, which has its own url and date window
+CASES = [
+    ("nfl", 2012, 267),
+    ("nfl", 2019, 267),
+    ("nba", 2012, 1230),
+    ("nba", 2019, 1230),
+    ("nhl", 2012, 1230),
+    ("nhl", 2016, 1230),
+    ("nhl", 2020, 868),
+    ("mlb", 2012, 2430),
+    ("mlb", 2016, 2430),
+]
+
+TABLES = {
+    "nfl": synthetic.nfl_table,
+    "nba": synthetic.nfl_table,
+    "nhl": synthetic.nhl_table,
+    "mlb": synthetic.mlb_table,
+}
+
+
+def fixture_path(sport, season, root=FIXTURES):
+    scraper = OddsScraper(sport, [season])
+    name = scraper._season_url(season).rsplit("/", 1)[-1]
+    return os.path.join(root, sport, name)
+
+
+def generate(root=FIXTURES):
+    for sport, season, games in CASES:
+        path = fixture_path(sport, season, root)
+        if os.path.isfile(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = TABLES[sport](season, games)
+        if path.endswith(".xlsx"):
+            table.to_excel(path, header=False, index=False, sheet_name="Sheet1")
+        else:
+            table.to_html(path, header=False, index=False)
+
+
+def record(cache_root, root=FIXTURES):
+    # copy real pages out of a RawCache, replacing generated fixtures
+    cache = RawCache(cache_root)
+    recorded = 0
+    for sport, season, _ in CASES:
+        url = OddsScraper(sport, [season])._season_url(season)
+        entry = cache.get(sport, season, url)
+        if entry is None:
+            continue
+        path = fixture_path(sport, season, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(cache._read(entry))
+        recorded += 1
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", type=str, help="raw page cache to record fixtures from")
+    args = parser.parse_args()
+    if args.record:
+        print(f"recorded {record(args.record)} fixtures from {args.record}")
+    generate()
+    print(f"fixtures in {FIXTURES}")
+
+
+if __name__ == "__main__":
+    main()
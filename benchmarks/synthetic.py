@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic season tables shaped like the raw sportsbookreviewsonline.com
+# pages: integer column labels, a header row at position 0 and every cell
+# stored as text, the way pd.read_html / pd.read_excel hand them back.
+
+NFL_TEAMS = ["Arizona", "Atlanta", "Baltimore", "Buffalo", "Carolina", "Chicago",
+             "Cincinnati", "Cleveland", "Dallas", "Denver", "Detroit", "GreenBay"]
+NHL_TEAMS = ["Anaheim", "Boston", "Buffalo", "Calgary", "Carolina", "Chicago",
+             "Colorado", "Dallas", "Detroit", "Edmonton", "Florida", "Winnipeg"]
+MLB_TEAMS = ["ARI", "ATL", "BAL", "BOS", "CUB", "CWS", "CIN", "CLE", "COL", "DET",
+             "HOU", "KAN"]
+
+
+def _dates(rng, n_games, months):
+    month = rng.choice(months, n_games)
+    day = rng.integers(1, 29, n_games)
+    return np.sort(month * 100 + day, kind="stable")
+
+
+def _ml(rng, n):
+    fav = -rng.integers(105, 300, n)
+    dog = rng.integers(100, 260, n)
+    return fav, dog
+
+
+def nfl_table(season, n_games, seed=0):
+    rng = np.random.default_rng(seed + season)
+    rows = [["Date", "Rot", "VH", "Team", "1st", "2nd", "3rd", "4th", "Final",
+             "Open", "Close", "ML", "2H"]]
+    dates = _dates(rng, n_games, [9, 10, 11, 12, 1])
+    fav, dog = _ml(rng, n_games)
+    for g in range(n_games):
+        teams = rng.choice(NFL_TEAMS, 2, replace=False)
+        q = rng.integers(0, 15, (2, 4))
+        spread = rng.choice([1.5, 3, 3.5, 6.5, 7])
+        total = rng.choice([38.5, 42, 44.5, 48])
+        home_fav = rng.random() < 0.5
+        away_spread = rng.random() < 0.5
+        for side in (0, 1):
+            is_home = side == 1
+            odds = spread if away_spread != is_home else total
+            ml = fav[g] if home_fav == is_home else dog[g]
+            open_ = "pk" if rng.random() < 0.01 else str(odds)
+            rows.append([str(dates[g]), str(100 + 2 * g + side), "VH"[side], teams[side],
+                         *map(str, q[side]), str(q[side].sum()), open_, str(odds),
+                         str(ml), str(odds / 2)])
+    return pd.DataFrame(rows)
+
+
+def nhl_table(season, n_games, seed=0):
+    rng = np.random.default_rng(seed + season)
+    modern = season > 2013
+    header = ["Date", "Rot", "VH", "Team", "1st", "2nd", "3rd", "Final", "Open",
+              "Close"] + (["PuckLine", ""] if modern else []) + ["OpenOU", "", "CloseOU", ""]
+    rows = [header]
+    months = [1, 2, 3] if season == 2020 else [10, 11, 12, 1, 2, 3]
+    dates = _dates(rng, n_games, months)
+    fav, dog = _ml(rng, n_games)
+    for g in range(n_games):
+        teams = rng.choice(NHL_TEAMS, 2, replace=False)
+        p = rng.integers(0, 4, (2, 3))
+        total = str(rng.choice([5, 5.5, 6]))
+        for side in (0, 1):
+            ml = fav[g] if side else dog[g]
+            puck = ["1.5" if side == 0 else "-1.5", str(rng.integers(-250, 200))] if modern else []
+            rows.append([str(dates[g]), str(50 + 2 * g + side), "VH"[side], teams[side],
+                         *map(str, p[side]), str(p[side].sum()),
+                         "NL" if rng.random() < 0.01 else str(ml), str(ml), *puck,
+                         total, "-110", total, "-105"])
+    return pd.DataFrame(rows)
+
+
+def mlb_table(season, n_games, seed=0):
+    rng = np.random.default_rng(seed + season)
+    modern = season > 2013
+    rows = [["Date", "Rot", "VH", "Team", "Pitcher", "1st", "2nd", "3rd", "4th", "5th",
+             "6th", "7th", "8th", "9th", "Final", "Open", "Close"]
+            + (["RunLine", ""] if modern else []) + ["OpenOU", "", "CloseOU", ""]]
+    dates = _dates(rng, n_games, [4, 5, 6, 7, 8, 9])
+    fav, dog = _ml(rng, n_games)
+    for g in range(n_games):
+        teams = rng.choice(MLB_TEAMS, 2, replace=False)
+        inn = rng.integers(0, 3, (2, 9))
+        total = float(rng.choice([7.5, 8, 8.5, 9]))
+        for side in (0, 1):
+            ml = int(fav[g] if side else dog[g])
+            run = [1.5 if side == 0 else -1.5, int(rng.integers(-250, 200))] if modern else []
+            rows.append([int(dates[g]), 900 + 2 * g + side, "VH"[side], teams[side],
+                         f"PITCHER{g % 40}-{'LR'[g % 2]}", *map(int, inn[side]),
+                         int(inn[side].sum()), ml, ml, *run, total, -110, total, -105])
+    return pd.DataFrame(rows)
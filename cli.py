@@ -1,47 +1,426 @@
 import argparse
+import os
+import sys
+
 import config
-from scrapers.sportsbookreview import (
-    NFLOddsScraper,
-    NBAOddsScraper,
-    NHLOddsScraper,
-    MLBOddsScraper,
-)
-
-parser = argparse.ArgumentParser()
-parser.add_argument("--sport", type=str, required=True)
-# start and end years
-parser.add_argument("--start", type=int, required=True)
-parser.add_argument("--end", type=int, required=True)
-# filename for output
-parser.add_argument("--filename", type=str, required=True)
-# output format (csv or json), default is json
-parser.add_argument("--format", type=str, default="json")
-
-args = parser.parse_args()
 
-if __name__ == "__main__":
-    if args.start < config.MIN_YEAR or args.end > config.MAX_YEAR:
+# pandas, requests and the scrapers are only imported by the subcommands
+# that need them, so --help and cache commands start quickly
+
+
+def _check_format(fmt):
+    from scrapers.output import FORMATS
+
+    fmt = fmt.lower()
+    if fmt not in FORMATS:
+        raise ValueError(
+            "Invalid output format. Must be csv, json, jsonl, parquet, feather or sqlite."
+        )
+    return fmt
+
+
+def _years(start, end):
+    if start < config.MIN_YEAR or end > config.MAX_YEAR:
         raise ValueError(
             f"Invalid year range. Must be between {config.MIN_YEAR} and {config.MAX_YEAR}."
         )
-    if args.start > args.end:
+    if start > end:
         raise ValueError("Invalid year range. Start year must be before end year.")
+    return list(range(start, end + 1))
+
+
+def _date_range(value):
+    # "first:last" in YYYY-MM-DD, either side may be left empty
+    from datetime import date
+
+    first, sep, last = value.partition(":")
+    if not sep:
+        raise ValueError("Invalid date range. Must be FIRST:LAST, e.g. 2016-04-01:2016-06-30.")
+    bounds = []
+    for part in (first, last):
+        if not part:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(date.fromisoformat(part).isoformat())
+        except ValueError:
+            raise ValueError(f"Invalid date {part!r}. Must be YYYY-MM-DD.") from None
+    if None not in bounds and bounds[0] > bounds[1]:
+        raise ValueError("Invalid date range. First date must be before last date.")
+    return tuple(bounds)
+
+
+def _finish(scraper, path, naming):
+    # manifest, quarantine and warnings written after every scraped output
+    from scrapers.output import quarantine_path, write_manifest
+
+    write_manifest(path, scraper.sport, scraper.hashes)
+    quarantine = scraper.quarantined()
+    if len(quarantine):
+        quarantine.to_csv(quarantine_path(path), index=False)
+        reasons = quarantine["reason"].str.split("; ").explode().value_counts()
+        print(
+            f"WARNING: {len(quarantine)} games failed validation "
+            f"({int(quarantine['dropped'].sum())} left out of the output), "
+            f"see ./{quarantine_path(path)}"
+        )
+        for reason, n in reasons.items():
+            print(f"  {reason}: {n}")
+    unmapped = scraper.unmapped_names()
+    if unmapped:
+        print(f"WARNING: no {naming} translation for: {', '.join(unmapped)}")
 
-    list_yrs = list(range(args.start, args.end + 1))
-    scrapers = {
-        "nfl": NFLOddsScraper,
-        "nba": NBAOddsScraper,
-        "nhl": NHLOddsScraper,
-        "mlb": MLBOddsScraper,
-    }
-    scraper = scrapers[args.sport.lower()](list_yrs)
-    data = scraper.driver()
-
-    if args.format.lower() == "csv":
-        data.to_csv(f"data/{args.filename}.csv", index=False)
-        print(f'saved dataframe to ./data/{args.filename}.csv')
-    elif args.format.lower() == "json":
-        data.to_json(f"data/{args.filename}.json", orient="records")
-        print(f'saved dataframe to ./data/{args.filename}.json')
+
+def scrape(args):
+    import cProfile
+    import json
+    import time
+
+    from scrapers.cache import RawCache
+    from scrapers.changes import change_records, diff_games, summary, write_changes
+    from scrapers.checkpoint import Checkpoint
+    from scrapers.output import (
+        SeasonWriter,
+        as_schema,
+        changes_path,
+        output_path,
+        read_manifest,
+        read_output,
+        write_output,
+    )
+    from scrapers.sportsbookreview import OddsScraper
+
+    list_yrs = _years(args.start, args.end)
+    fmt = _check_format(args.format)
+    if args.stream and (args.incremental or args.changes):
+        raise ValueError("--stream cannot be combined with --incremental or --changes.")
+    columns = args.columns.split(",") if args.columns else None
+    teams = args.teams.split(",") if args.teams else None
+    dates = _date_range(args.date_range) if args.date_range else None
+    filtered = columns is not None or teams is not None or dates is not None
+    if filtered and (args.incremental or args.changes):
+        raise ValueError(
+            "--columns, --teams and --date-range cannot be combined with "
+            "--incremental or --changes."
+        )
+
+    started = time.perf_counter()
+    sport = args.sport
+    fetcher = _fetcher(args)
+    cache = None if args.no_cache else RawCache()
+    # --incremental already skips unchanged seasons and doesn't checkpoint
+    checkpoint = None
+    if not args.incremental:
+        checkpoint = Checkpoint(
+            os.path.join(args.work_dir, args.filename),
+            sport,
+            resume=args.resume,
+            options={
+                "columns": columns,
+                "teams": teams,
+                "dates": list(dates) if dates else None,
+                "enrich": args.enrich,
+            },
+        )
+    scraper = OddsScraper(
+        sport,
+        list_yrs,
+        fetcher=fetcher,
+        cache=cache,
+        workers=1 if args.cprofile else args.parse_workers,
+        naming=args.naming,
+        checkpoint=checkpoint,
+        enrich=args.enrich,
+        columns=columns,
+        teams=teams,
+        dates=dates,
+    )
+    if args.cprofile:
+        scraper.instrument.profiler = cProfile.Profile()
+    path = output_path(args.filename, fmt)
+
+    if args.stream:
+        with SeasonWriter(path, fmt, sport, scraper.dtypes) as writer:
+            for season, frame in scraper.iter_seasons():
+                writer.write(frame)
+                print(f"wrote season {season} to ./{path}")
     else:
-        raise ValueError("Invalid output format. Must be csv or json.")
+        previous = None
+        if (args.incremental or args.changes) and os.path.exists(path):
+            # in the scraper's own types, so old and new games compare equal
+            previous = as_schema(read_output(path, fmt, sport), scraper.dtypes)
+        if args.incremental and previous is not None:
+            data, stale = scraper.update(previous, read_manifest(path, sport))
+            print(f"rebuilt seasons: {stale if stale else 'none'}")
+        else:
+            data = scraper.driver()
+        if args.changes:
+            # only the requested seasons are compared
+            if previous is None:
+                previous = data.iloc[0:0]
+            diff = diff_games(
+                previous[previous["season"].isin(list_yrs)],
+                data[data["season"].isin(list_yrs)],
+            )
+            write_changes(changes_path(path), change_records(sport, diff))
+            print(f"changes: {summary(diff)}, see ./{changes_path(path)}")
+        write_output(data, path, fmt, sport, scraper.dtypes)
+
+    _finish(scraper, path, args.naming)
+    if checkpoint is not None:
+        checkpoint.clear()
+    if args.profile:
+        report = scraper.instrument.report()
+        report["sport"] = sport
+        report["seasons"] = list_yrs
+        report["seconds"] = time.perf_counter() - started
+        report["cleaned"] = scraper.cleaned
+        report["warnings"] = scraper.warnings
+        with open(args.profile, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"saved profile report to ./{args.profile}")
+    if args.cprofile:
+        scraper.instrument.profiler.dump_stats(args.cprofile)
+        print(f"saved cProfile stats to ./{args.cprofile}")
+    print(f"saved dataframe to ./{path}")
+
+
+def batch(args):
+    import json
+
+    from scrapers.batch import BatchRunner
+    from scrapers.cache import RawCache
+    from scrapers.output import output_path, write_output
+
+    with open(args.manifest, "r") as f:
+        jobs = json.load(f)["jobs"]
+    for job in jobs:
+        job["seasons"] = _years(job["start"], job["end"])
+        job["format"] = _check_format(job.get("format", "json"))
+
+    runner = BatchRunner(
+        jobs,
+        _fetcher(args),
+        cache=None if args.no_cache else RawCache(),
+        workers=args.parse_workers,
+        naming=args.naming,
+        retries=args.retries,
+        enrich=args.enrich,
+    )
+    for job, scraper, data in zip(jobs, runner.scrapers, runner.run()):
+        path = output_path(job["filename"], job["format"])
+        write_output(data, path, job["format"], scraper.sport, scraper.dtypes)
+        _finish(scraper, path, args.naming)
+        print(f"saved {scraper.sport} dataframe to ./{path}")
+    for (i, season), error in sorted(runner.failed.items()):
+        print(f"ERROR: {jobs[i]['sport']} {season} failed: {error}")
+    if runner.failed:
+        sys.exit(1)
+
+
+def convert(args):
+    from scrapers.output import output_path, read_output, write_output
+    from scrapers.sports import get_sport
+
+    sport = get_sport(args.sport)
+    fmt = _check_format(args.format)
+    if args.source_format == "archive":
+        from scrapers.archive import ArchiveReader
+
+        with ArchiveReader(args.input, sport.name) as reader:
+            df = reader.read()
+    else:
+        df = read_output(args.input, _check_format(args.source_format), sport.name)
+    path = output_path(args.filename, fmt)
+    write_output(df, path, fmt, sport.name, sport.dtypes)
+    print(f"saved {len(df)} games to ./{path}")
+
+
+def query(args):
+    from scrapers.sports import get_sport
+    from scrapers.store import OddsStore
+
+    store = OddsStore(args.db, read_only=True)
+    try:
+        df = store.games(
+            get_sport(args.sport).name,
+            seasons=args.season,
+            team=args.team,
+            start=args.start,
+            end=args.end,
+            columns=args.columns.split(",") if args.columns else None,
+        )
+    finally:
+        store.close()
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"saved {len(df)} games to ./{args.output}")
+    else:
+        df.to_csv(sys.stdout, index=False)
+
+
+def cache(args):
+    import shutil
+
+    from scrapers.cache import RawCache
+
+    if args.action == "clear":
+        shutil.rmtree(args.root, ignore_errors=True)
+        print(f"cleared {args.root}")
+        return
+    raw = RawCache(args.root, max_bytes=args.max_bytes)
+    if args.action == "evict":
+        raw.evict()
+        raw._save()
+    sizes = {entry["hash"]: entry["size"] for entry in raw.index.values()}
+    final = sum(1 for entry in raw.index.values() if entry["final"])
+    print(
+        f"{len(raw.index)} pages ({final} finished seasons), {len(sizes)} objects, "
+        f"{sum(sizes.values()) / 2**20:.1f} MiB in {args.root}"
+    )
+
+
+def _timeout(value):
+    # "60" for both the connect and the read timeout, or "10,60" for each
+    parts = value.split(",")
+    try:
+        seconds = tuple(float(p) for p in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid timeout {value!r}") from None
+    if len(seconds) > 2:
+        raise argparse.ArgumentTypeError(f"invalid timeout {value!r}, expected CONNECT,READ")
+    return seconds if len(seconds) == 2 else seconds[0]
+
+
+def _http_arguments(p):
+    # seconds before a request times out (CONNECT,READ or one value for both,
+    # default is Fetcher's 10 to connect and 60 to read), and how often a
+    # request that timed out, lost its connection or got a 429/5xx is
+    # retried (with exponential backoff)
+    p.add_argument("--timeout", type=_timeout)
+    p.add_argument("--http-retries", type=int, default=3)
+
+
+def _fetcher(args):
+    from scrapers.fetch import Fetcher
+
+    options = {"max_workers": args.workers, "retries": args.http_retries}
+    if args.timeout is not None:
+        options["timeout"] = args.timeout
+    return Fetcher(**options)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("scrape", help="scrape seasons into an output file")
+    p.set_defaults(func=scrape)
+    # nfl, nba, nhl or mlb
+    p.add_argument("--sport", type=str.lower, required=True)
+    # start and end years
+    p.add_argument("--start", type=int, required=True)
+    p.add_argument("--end", type=int, required=True)
+    # filename for output
+    p.add_argument("--filename", type=str, required=True)
+    # output format (csv, json, jsonl, parquet, feather or sqlite), default is json
+    p.add_argument("--format", type=str, default="json")
+    # write each season to the output file as soon as it is processed
+    p.add_argument("--stream", action="store_true")
+    # number of seasons to download at once
+    p.add_argument("--workers", type=int, default=8)
+    # number of processes used to parse seasons
+    p.add_argument("--parse-workers", type=int, default=os.cpu_count())
+    # team naming scheme: nickname (config/translated.json) or ysports
+    # (config/translated-ysports.json)
+    p.add_argument("--naming", type=str, default="nickname")
+    # raw season pages are cached under data/src unless --no-cache is given
+    p.add_argument("--no-cache", action="store_true")
+    # only rebuild seasons whose source page changed since the last run
+    p.add_argument("--incremental", action="store_true")
+    # append inserted, updated and deleted games, compared with the existing
+    # output, to <output>.changes.jsonl
+    p.add_argument("--changes", action="store_true")
+    # add implied probabilities, hold, line movement, ATS and over/under
+    # result columns (see scrapers/metrics.py)
+    p.add_argument("--enrich", action="store_true")
+    # only build these comma separated output columns (the season, date and
+    # team columns are always kept)
+    p.add_argument("--columns", type=str)
+    # only keep games involving one of these comma separated teams, named
+    # as in the output
+    p.add_argument("--teams", type=str)
+    # only keep games played from FIRST to LAST (YYYY-MM-DD:YYYY-MM-DD,
+    # either side may be left empty)
+    p.add_argument("--date-range", type=str)
+    # finished seasons are checkpointed under <work-dir>/<filename> until the
+    # run succeeds; --resume picks a failed run up from there
+    p.add_argument("--work-dir", type=str, default="data/work")
+    p.add_argument("--resume", action="store_true")
+    _http_arguments(p)
+    # write per-season stage timings and run counters to this JSON file
+    p.add_argument("--profile", type=str)
+    # run cProfile around the parse, reformat and schema stages and dump the
+    # stats to this file (parsing then runs in-process)
+    p.add_argument("--cprofile", type=str)
+
+    p = commands.add_parser("batch", help="run a manifest of scrape jobs as one pipeline")
+    p.set_defaults(func=batch)
+    # JSON file: {"jobs": [{"sport", "start", "end", "filename", "format"}]}
+    p.add_argument("--manifest", type=str, required=True)
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--parse-workers", type=int, default=os.cpu_count())
+    p.add_argument("--naming", type=str, default="nickname")
+    p.add_argument("--no-cache", action="store_true")
+    # times a failed season is retried on its own
+    p.add_argument("--retries", type=int, default=2)
+    p.add_argument("--enrich", action="store_true")
+    _http_arguments(p)
+
+    p = commands.add_parser("convert", help="rewrite an output file in another format")
+    p.set_defaults(func=convert)
+    p.add_argument("--sport", type=str.lower, required=True)
+    # existing output (file, partition directory or .db) and its format;
+    # "archive" reads a legacy archive such as data/nfl_archive_10Y.json
+    p.add_argument("--input", type=str, required=True)
+    p.add_argument("--from", dest="source_format", type=str, required=True)
+    # filename and format to write, as for scrape
+    p.add_argument("--filename", type=str, required=True)
+    p.add_argument("--format", type=str, default="json")
+
+    p = commands.add_parser("query", help="select games from a sqlite output as csv")
+    p.set_defaults(func=query)
+    p.add_argument("--sport", type=str.lower, required=True)
+    p.add_argument("--db", type=str, default="data/odds.db")
+    # repeat for more than one season
+    p.add_argument("--season", type=int, action="append")
+    # games where this team played home or away
+    p.add_argument("--team", type=str)
+    # inclusive YYYY-MM-DD date range
+    p.add_argument("--start", type=str)
+    p.add_argument("--end", type=str)
+    # comma separated columns, default is all of them
+    p.add_argument("--columns", type=str)
+    # csv file to write, default is stdout
+    p.add_argument("--output", type=str)
+
+    p = commands.add_parser("cache", help="inspect or trim the raw page cache")
+    p.set_defaults(func=cache)
+    p.add_argument("action", choices=["stats", "evict", "clear"])
+    p.add_argument("--root", type=str, default="data/src")
+    # evict least recently used pages until the cache fits in this many bytes
+    p.add_argument("--max-bytes", type=int, default=512 * 2**20)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # runs written before subcommands existed (cli.py --sport ...) scrape
+    if argv and argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        argv = ["scrape", *argv]
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
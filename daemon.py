@@ -0,0 +1,73 @@
+import argparse
+
+# pandas, requests and the scrapers are only imported once the arguments
+# are parsed, so --help starts quickly
+
+
+def build_parser():
+    parser = argparse.ArgumentParser()
+    # sports to keep refreshed (nfl, nba, nhl or mlb); repeat for more than one
+    parser.add_argument("--sport", type=str.lower, action="append", required=True)
+    # season to refresh, default is each sport's current season, moving on
+    # to the next one when it starts
+    parser.add_argument("--season", type=int)
+    # seconds between refreshes of a sport, spread by +/- jitter
+    parser.add_argument("--interval", type=float, default=900)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    # seconds before retrying a failed refresh, doubled on each failure up to
+    # --max-retry
+    parser.add_argument("--retry", type=float, default=60)
+    parser.add_argument("--max-retry", type=float, default=3600)
+    # changed games are upserted into this SQLite file
+    parser.add_argument("--db", type=str, default="data/odds.db")
+    # append inserted, updated and deleted games to this JSON lines file
+    parser.add_argument("--changes", type=str)
+    # local JSON API port (GET /<sport>, GET /status); 0 disables it
+    parser.add_argument("--port", type=int, default=8765)
+    # team naming scheme: nickname or ysports
+    parser.add_argument("--naming", type=str, default="nickname")
+    # number of seasons to download at once
+    parser.add_argument("--workers", type=int, default=8)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from scrapers.cache import RawCache
+    from scrapers.fetch import Fetcher
+    from scrapers.service import OddsService, serve_http
+    from scrapers.store import OddsStore
+
+    service = OddsService(
+        args.sport,
+        store=OddsStore(args.db),
+        changes=args.changes,
+        season=args.season,
+        interval=args.interval,
+        jitter=args.jitter,
+        retry=args.retry,
+        max_retry=args.max_retry,
+        fetcher=Fetcher(max_workers=args.workers),
+        cache=RawCache(),
+        naming=args.naming,
+    )
+    server = serve_http(service, port=args.port) if args.port else None
+    service.start()
+    print(f"refreshing {', '.join(service.scrapers)} every {args.interval:g}s")
+    try:
+        if server is not None:
+            print(f"serving the latest games on http://127.0.0.1:{server.server_port}/<sport>")
+            server.serve_forever()
+        else:
+            service._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        if server is not None:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
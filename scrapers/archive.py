@@ -0,0 +1,124 @@
+import json
+import mmap
+import re
+
+import pandas as pd
+
+from scrapers.sports import get_sport
+from scrapers.store import team_columns
+
+# column names used by the pre-scraped archives in data/ before the
+# current schema
+LEGACY_COLUMNS = {
+    "home_close_ml": "ML_H_cl_odds",
+    "away_close_ml": "ML_A_cl_odds",
+    "home_close_spread": "S_H_cl_line",
+    "away_close_spread": "S_A_cl_line",
+    "open_over_under": "OU_op_line",
+    "close_over_under": "OU_cl_line",
+}
+
+_SEASON = re.compile(rb'"season"\s*:\s*(\d+)')
+# a whole JSON string, escapes included, or a brace outside of strings
+_TOKENS = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}]', re.S)
+_OPEN, _CLOSE = ord("{"), ord("}")
+
+
+def _date(value):
+    # archives store dates as floats such as 20110908.0
+    if isinstance(value, (int, float)):
+        value = str(int(value))
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return value
+
+
+def normalise(record, columns):
+    # `record` renamed to the current schema, in schema order; columns the
+    # archive doesn't have are None
+    record = {LEGACY_COLUMNS.get(k, k): v for k, v in record.items()}
+    if "date" in record:
+        record["date"] = _date(record["date"])
+    return {col: record.get(col) for col in columns}
+
+
+class ArchiveReader:
+    # Streams the records of a records-oriented JSON array (such as
+    # data/nfl_archive_10Y.json) from a memory-mapped file, one object at a
+    # time, normalised to the current schema of `sport`. Records outside
+    # `seasons` or not involving `team` are skipped from their raw bytes
+    # where possible, before they are decoded.
+    def __init__(self, path, sport="nfl", seasons=None, team=None):
+        self.columns = list(get_sport(sport).columns)
+        self.home, self.away = team_columns(self.columns)
+        self.seasons = set(seasons) if seasons is not None else None
+        self.team = team
+        self._needle = json.dumps(team).encode() if team is not None else None
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _objects(self):
+        # raw bytes of each top level object, found without decoding: strings
+        # are skipped whole (escapes included), so only braces outside of
+        # strings are counted and an object ends where they balance again
+        buf = self._map
+        depth = 0
+        start = None
+        for m in _TOKENS.finditer(buf, buf.find(b"[") + 1):
+            c = buf[m.start()]
+            if c == _OPEN:
+                if depth == 0:
+                    start = m.start()
+                depth += 1
+            elif c == _CLOSE and depth:
+                depth -= 1
+                if depth == 0:
+                    yield buf[start:m.end()]
+        if depth:
+            raise ValueError(f"unterminated record at byte {start}")
+
+    def _wanted(self, raw):
+        if self.seasons is not None:
+            m = _SEASON.search(raw)
+            if m is not None and int(m.group(1)) not in self.seasons:
+                return False
+        if self._needle is not None and self._needle not in raw:
+            return False
+        return True
+
+    def __iter__(self):
+        for raw in self._objects():
+            if not self._wanted(raw):
+                continue
+            record = normalise(json.loads(raw), self.columns)
+            if self.seasons is not None and record["season"] not in self.seasons:
+                continue
+            if self.team is not None and self.team not in (record[self.home], record[self.away]):
+                continue
+            yield record
+
+    def chunks(self, size=10000):
+        # DataFrames of at most `size` records in the current schema
+        batch = []
+        for record in self:
+            batch.append(record)
+            if len(batch) == size:
+                yield pd.DataFrame(batch, columns=self.columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=self.columns)
+
+    def read(self):
+        frames = list(self.chunks())
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
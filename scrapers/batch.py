@@ -0,0 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+
+from scrapers.sportsbookreview import OddsScraper
+
+
+class BatchRunner:
+    # Runs several jobs ({"sport", "seasons"}) as one pipeline. Every job's
+    # season pages are downloaded in one interleaved batch on the shared
+    # fetcher, so per-host limits hold across sports, and parsed on one
+    # shared worker pool. A season that fails to download or parse is
+    # retried on its own, up to `retries` more times, and is otherwise
+    # reported in `failed` without holding back the rest of its job.
+    def __init__(
+        self, jobs, fetcher, cache=None, workers=1, naming="nickname", retries=2, enrich=False
+    ):
+        self.jobs = jobs
+        self.scrapers = [
+            OddsScraper(
+                job["sport"],
+                job["seasons"],
+                fetcher=fetcher,
+                cache=cache,
+                naming=naming,
+                enrich=enrich,
+            )
+            for job in jobs
+        ]
+        self.fetcher = fetcher
+        self.cache = cache
+        self.workers = workers
+        self.retries = retries
+        # job index -> season -> frame
+        self.frames = [{} for _ in jobs]
+        # (job index, season) -> error of the last attempt
+        self.failed = {}
+
+    def _interleave(self, pending):
+        # one season of each job in turn, so no sport waits behind another
+        by_job = {}
+        for i, season in pending:
+            by_job.setdefault(i, []).append((i, season))
+        return [t for group in zip_longest(*by_job.values()) for t in group if t is not None]
+
+    def _download(self, pending):
+        urls = [self.scrapers[i]._season_url(season) for i, season in pending]
+        if self.cache is None:
+            responses = self.fetcher.fetch_all(urls, return_exceptions=True)
+            outcomes = [
+                (None, 0.0) if isinstance(r, Exception) else (None, r.elapsed.total_seconds())
+                for r in responses
+            ]
+            contents = [r if isinstance(r, Exception) else r.content for r in responses]
+        else:
+            items = [
+                (self.scrapers[i].sport, season, url, self.scrapers[i]._season_final(season))
+                for (i, season), url in zip(pending, urls)
+            ]
+            contents = self.cache.fetch_all(self.fetcher, items, return_exceptions=True)
+            outcomes = self.cache.last
+        for (i, season), content, (cache, seconds) in zip(pending, contents, outcomes):
+            if not isinstance(content, Exception):
+                self.scrapers[i]._downloaded(season, content, cache, seconds)
+        return contents
+
+    def _parse(self, pool, pending, contents):
+        # yields ((job index, season), (frame, report) or exception)
+        tasks = []
+        for (i, season), content in zip(pending, contents):
+            if isinstance(content, Exception):
+                tasks.append(((i, season), content))
+            elif pool is None:
+                try:
+                    tasks.append(((i, season), self.scrapers[i]._season_schema(content, season)))
+                except Exception as e:
+                    tasks.append(((i, season), e))
+            else:
+                tasks.append(((i, season), pool.submit(self.scrapers[i]._season_schema, content, season)))
+        for key, task in tasks:
+            if pool is not None and not isinstance(task, Exception):
+                try:
+                    task = task.result()
+                except Exception as e:
+                    task = e
+            yield key, task
+
+    def run(self):
+        # returns one combined frame per job, seasons in job order
+        pending = self._interleave(
+            [(i, season) for i, job in enumerate(self.jobs) for season in job["seasons"]]
+        )
+        pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        try:
+            for attempt in range(self.retries + 1):
+                if not pending:
+                    break
+                if attempt:
+                    print(f"retrying {len(pending)} failed seasons")
+                contents = self._download(pending)
+                failed = []
+                for (i, season), result in self._parse(pool, pending, contents):
+                    if isinstance(result, Exception):
+                        self.failed[(i, season)] = repr(result)
+                        failed.append((i, season))
+                        continue
+                    self.failed.pop((i, season), None)
+                    self.frames[i][season] = self.scrapers[i]._absorb(season, *result)
+                pending = failed
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return [
+            scraper._combine(frames[s] for s in job["seasons"] if s in frames)
+            for scraper, job, frames in zip(self.scrapers, self.jobs, self.frames)
+        ]
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import time
+
+
+class RawCache:
+    # Raw season pages stored once per content hash under objects/, with an
+    # index keyed by sport, season and url. Finished seasons are served from
+    # disk without touching the network; the rest are revalidated with
+    # conditional GETs against the stored ETag / Last-Modified.
+    def __init__(self, root="data/src", max_bytes=512 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(root, "index.json")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, "r") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0}
+        # (outcome, seconds on the network) for each item of the last fetch_all
+        self.last = []
+
+    @staticmethod
+    def _key(sport, season, url):
+        return f"{sport}/{season}/{url}"
+
+    def _path(self, digest):
+        return os.path.join(self.root, "objects", digest)
+
+    def _read(self, entry):
+        entry["used"] = time.time()
+        with open(self._path(entry["hash"]), "rb") as f:
+            return f.read()
+
+    def _write(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._path(digest)
+        if not os.path.isfile(path):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        return digest
+
+    def _save(self):
+        tmp = self.index_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, self.index_file)
+
+    @staticmethod
+    def _conditional(entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get(self, sport, season, url):
+        entry = self.index.get(self._key(sport, season, url))
+        if entry is None or not os.path.isfile(self._path(entry["hash"])):
+            return None
+        return entry
+
+    def fetch_all(self, fetcher, items, return_exceptions=False):
+        # items are (sport, season, url, final) tuples; returns the raw bytes
+        # for each item, in order (or its exception, see Fetcher.fetch_all)
+        results = [None] * len(items)
+        self.last = [("hit", 0.0)] * len(items)
+        pending = []
+        for i, (sport, season, url, final) in enumerate(items):
+            entry = self.get(sport, season, url)
+            if entry is not None and entry["final"]:
+                results[i] = self._read(entry)
+                self.stats["hit"] += 1
+            else:
+                pending.append((i, entry))
+
+        responses = fetcher.fetch_all(
+            [items[i][2] for i, _ in pending],
+            headers=[self._conditional(entry) for _, entry in pending],
+            return_exceptions=return_exceptions,
+        )
+        for (i, entry), r in zip(pending, responses):
+            sport, season, url, final = items[i]
+            if isinstance(r, Exception):
+                self.last[i] = ("error", 0.0)
+                results[i] = r
+                continue
+            if r.status_code == 304 and entry is not None:
+                self.stats["revalidated"] += 1
+                self.last[i] = ("revalidated", r.elapsed.total_seconds())
+                entry["final"] = final
+                results[i] = self._read(entry)
+                continue
+            self.stats["miss"] += 1
+            self.last[i] = ("miss", r.elapsed.total_seconds())
+            content = r.content
+            self.index[self._key(sport, season, url)] = {
+                "hash": self._write(content),
+                "size": len(content),
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "final": final,
+                "fetched": time.time(),
+                "used": time.time(),
+            }
+            results[i] = content
+
+        self.evict()
+        self._save()
+        return results
+
+    def evict(self):
+        # drop least recently used objects until the cache fits in max_bytes
+        sizes = {}
+        used = {}
+        for entry in self.index.values():
+            sizes[entry["hash"]] = entry["size"]
+            used[entry["hash"]] = max(used.get(entry["hash"], 0), entry["used"])
+        total = sum(sizes.values())
+        evicted = set()
+        for digest in sorted(used, key=used.get):
+            if total <= self.max_bytes:
+                break
+            if os.path.isfile(self._path(digest)):
+                os.remove(self._path(digest))
+            total -= sizes[digest]
+            evicted.add(digest)
+        if evicted:
+            self.index = {k: v for k, v in self.index.items() if v["hash"] not in evicted}
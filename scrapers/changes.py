@@ -0,0 +1,106 @@
+import json
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+from scrapers.store import team_columns, with_game_no
+
+OPS = ("insert", "update", "delete")
+
+
+def key_columns(columns):
+    # a game is identified by sport, date, teams and game_no (the index of
+    # a game among those with the same date and teams, e.g. doubleheaders)
+    home, away = team_columns(columns)
+    return ["date", home, away, "game_no"]
+
+
+def _value(v):
+    # dates (datetime.date, Timestamp) as YYYY-MM-DD, anything else as is
+    return v.strftime("%Y-%m-%d") if isinstance(v, date) else v
+
+
+def _canonical(col):
+    # one representation per value whatever format the snapshot was read
+    # from: dates as YYYY-MM-DD strings, numbers as floats, rest as objects.
+    # Object columns are converted value by value, as they can hold a mix
+    # (e.g. datetime.date from parquet next to strings from a fresh scrape)
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.dt.strftime("%Y-%m-%d").astype(object)
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype(object)
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        return col.astype("float64")
+    return col.astype(object).map(_value)
+
+
+def _keyed(df):
+    df = with_game_no(df)
+    keys = key_columns(df.columns)
+    df = df.assign(**{c: _canonical(df[c]) for c in keys[:3]})
+    return df.set_index(keys)
+
+
+def diff_games(old, new):
+    # {"insert": games only in new, "update": games in both whose values
+    # differ, "delete": games only in old, "changed": bool frame of the
+    # differing cells of each updated game}; frames are indexed by game key
+    new = _keyed(new)
+    old = _keyed(old).reindex(columns=new.columns) if not old.empty else new.iloc[0:0]
+
+    common = new.index.intersection(old.index)
+    a = old.loc[common].apply(_canonical)
+    b = new.loc[common].apply(_canonical)
+    changed = (a != b) & ~(a.isna() & b.isna())
+    updated = changed.any(axis=1).to_numpy()
+    return {
+        "insert": new[~new.index.isin(old.index)],
+        "update": new.loc[common][updated],
+        "delete": old[~old.index.isin(new.index)],
+        "changed": changed[updated],
+        "before": old.loc[common][updated],
+    }
+
+
+def _records(frame):
+    # JSON-safe dicts of a keyed frame's rows, key columns included
+    return json.loads(frame.reset_index().to_json(orient="records"))
+
+
+def change_records(sport, diff, at=None):
+    # one dict per inserted, updated or deleted game: op, sport, key fields,
+    # the game as it is now (as it was, for deletes) and, for updates, the
+    # changed columns with their previous values
+    at = at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+    for op in OPS:
+        frame = diff[op]
+        if frame.empty:
+            continue
+        keys = frame.index.names
+        before = _records(diff["before"]) if op == "update" else None
+        changed = diff["changed"].to_numpy() if op == "update" else None
+        for i, game in enumerate(_records(frame)):
+            record = {"op": op, "sport": sport, "at": at}
+            record.update({k: game[k] for k in keys})
+            record["game"] = {k: v for k, v in game.items() if k not in keys}
+            if op == "update":
+                cols = frame.columns[changed[i]]
+                record["before"] = {c: before[i][c] for c in cols}
+            yield record
+
+
+def write_changes(path, records):
+    # appends records as JSON lines; returns how many were written
+    n = 0
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            n += 1
+    return n
+
+
+def summary(diff):
+    return (
+        f"{len(diff['insert'])} inserted, {len(diff['update'])} updated, "
+        f"{len(diff['delete'])} deleted"
+    )
@@ -0,0 +1,63 @@
+import json
+import os
+import pickle
+import shutil
+import time
+
+
+class Checkpoint:
+    # Work directory for one scrape run: every finished season is saved as
+    # season-<season>.pkl (its schema frame, season report and page hash)
+    # and listed in manifest.json, so a failed run can be resumed without
+    # redoing those seasons. Without `resume` any earlier work is discarded.
+    # `options` (JSON) records what shapes the saved frames, such as column
+    # and row filters; a run is only resumed with the same sport and options.
+    def __init__(self, root, sport, resume=False, options=None):
+        self.root = root
+        self.sport = sport
+        self.manifest_file = os.path.join(root, "manifest.json")
+        if not resume:
+            shutil.rmtree(root, ignore_errors=True)
+        os.makedirs(root, exist_ok=True)
+        self.manifest = {"sport": sport, "options": options, "seasons": {}}
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file, "r") as f:
+                self.manifest = json.load(f)
+            if self.manifest["sport"] != sport:
+                raise ValueError(
+                    f"{root} holds a {self.manifest['sport']} run, not {sport}."
+                )
+            if self.manifest.get("options") != options:
+                raise ValueError(
+                    f"{root} holds a run with options {self.manifest.get('options')}, "
+                    f"not {options}; rerun without --resume."
+                )
+
+    def _path(self, season):
+        return os.path.join(self.root, f"season-{season}.pkl")
+
+    def done(self):
+        return {int(s) for s in self.manifest["seasons"]}
+
+    def save(self, season, games, report, digest):
+        tmp = self._path(season) + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((games, report, digest), f)
+        os.replace(tmp, self._path(season))
+        self.manifest["seasons"][str(season)] = {
+            "hash": digest,
+            "games": len(games),
+            "finished": time.time(),
+        }
+        tmp = self.manifest_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.manifest_file)
+
+    def load(self, season):
+        # (games, report, page hash) of a finished season
+        with open(self._path(season), "rb") as f:
+            return pickle.load(f)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
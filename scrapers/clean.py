@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+# odds tokens sportsbookreview uses for "no line"; they become 0
+BLACKLIST = ("pk", "PK", "NL", "nl", "a100", "a105", "a110", ".5+03", ".5ev", "-")
+
+
+def decode_dates(codes, season, start=8, yr_end=12):
+    # MMDD codes -> YYYY-MM-DD. Months from start to yr_end fall in the season's
+    # first calendar year and the rest in the next one, e.g. start=3, yr_end=11
+    # for MLB and start=1, yr_end=3 for the COVID shortened 2020 NHL season.
+    num = pd.to_numeric(codes, errors="coerce")
+    month = num // 100
+    day = num % 100
+    year = np.where(month.between(start, yr_end), season, season + 1)
+    parts = pd.DataFrame({"year": year, "month": month, "day": day}, index=codes.index)
+    dates = pd.to_datetime(parts, errors="coerce")
+    bad = dates.isna()
+    if bad.any():
+        raise ValueError(f"invalid date code {codes[bad].iloc[0]!r} in season {season}")
+    return dates.dt.strftime("%Y-%m-%d")
+
+
+def clean_column(col, numeric=False, blacklist=BLACKLIST):
+    # replace blacklisted tokens with 0 and, if numeric, coerce the rest to
+    # float. Returns the cleaned column, how many cells were blacklisted or
+    # could not be read as numbers, and a bool mask of those cells for each
+    blacklisted = col.isin(blacklist).to_numpy(dtype=bool)
+    out = col.mask(blacklisted, 0) if blacklisted.any() else col
+    coerced = np.zeros(len(col), dtype=bool)
+    if numeric:
+        num = pd.to_numeric(out, errors="coerce").astype(float)
+        coerced = (num.isna() & out.notna()).to_numpy(dtype=bool)
+        out = num
+    counts = {"blacklisted": int(blacklisted.sum()), "coerced": int(coerced.sum())}
+    return out, counts, {"blacklisted": blacklisted, "coerced": coerced}
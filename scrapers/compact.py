@@ -0,0 +1,205 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from scrapers.output import apply_dtypes
+from scrapers.store import team_columns
+
+
+def _code_dtype(size):
+    # the int type pandas keeps the codes of a categorical with `size`
+    # categories in, so to_pandas can hand codes over without a cast
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _positions(codes, size):
+    # {code: row positions} for codes 0..size-1 (-1, missing, is left out)
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return {c: order[bounds[c]:bounds[c + 1]] for c in range(size)}
+
+
+class GameRecord:
+    # A view of one game of a GameTable; values are read from the table's
+    # columns on access. Columns are items (record["2H_total"]) and, where
+    # they are valid names, attributes (record.home_team).
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, col):
+        return self._table._value(col, self._row)
+
+    def __getattr__(self, name):
+        try:
+            return self._table._value(name, self._row)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_dict(self):
+        return {col: self._table._value(col, self._row) for col in self._table.columns}
+
+    def __repr__(self):
+        return f"GameRecord({self.to_dict()!r})"
+
+
+class GameTable:
+    # Read-only column store of a schema frame, for serving lookups. Columns
+    # typed as numbers in `dtypes` (a scraper's dtypes) are NumPy arrays of
+    # that type, with a bool mask where values are missing; every other
+    # column is integer codes (int8 for up to 126 values) into a tuple of its
+    # distinct values, interned when they are strings, so team names,
+    # pitchers and dates are stored once per table. Games are indexed by
+    # date and by team (home or away).
+    def __init__(self, df, dtypes):
+        typed = apply_dtypes(df.drop(columns="date"), dtypes)
+        self.columns = list(df.columns)
+        self.home, self.away = team_columns(self.columns)
+        # col -> (values, mask or None)
+        self._numbers = {}
+        # col -> (codes, distinct values)
+        self._codes = {}
+        for col in self.columns:
+            values = df[col] if col == "date" else typed[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self._codes[col] = self._intern(
+                    values.cat.codes.to_numpy(), values.cat.categories
+                )
+            elif col in dtypes and pd.api.types.is_numeric_dtype(values.dtype):
+                self._numbers[col] = self._numeric(values)
+            else:
+                codes, uniques = pd.factorize(values)
+                self._codes[col] = self._intern(codes, uniques)
+        self._length = len(df)
+        self._by_date = self._index("date")
+        self._by_team = self._team_index()
+
+    @staticmethod
+    def _intern(codes, uniques):
+        uniques = tuple(sys.intern(v) if isinstance(v, str) else v for v in uniques)
+        return codes.astype(_code_dtype(len(uniques)), copy=False), uniques
+
+    @staticmethod
+    def _numeric(col):
+        if pd.api.types.is_extension_array_dtype(col.dtype):
+            mask = col.isna().to_numpy()
+            dtype = col.dtype.numpy_dtype
+            values = col.to_numpy(dtype=dtype, na_value=0)
+            return values, mask if mask.any() else None
+        return col.to_numpy(), None
+
+    def _index(self, col):
+        codes, uniques = self._codes[col]
+        return dict(zip(uniques, _positions(codes, len(uniques)).values()))
+
+    def _team_index(self):
+        # a team's games as home or away side, in row order
+        home, away = self._index(self.home), self._index(self.away)
+        empty = np.empty(0, dtype=np.int32)
+        return {
+            team: np.union1d(home.get(team, empty), away.get(team, empty)).astype(np.int32)
+            for team in home.keys() | away.keys()
+        }
+
+    def _value(self, col, row):
+        # a plain Python value, None when missing
+        if col in self._codes:
+            codes, uniques = self._codes[col]
+            code = codes[row]
+            return None if code < 0 else uniques[code]
+        values, mask = self._numbers[col]
+        if mask is not None and mask[row]:
+            return None
+        value = values[row].item()
+        return None if value != value else value
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, row):
+        if not -self._length <= row < self._length:
+            raise IndexError(row)
+        return GameRecord(self, row % self._length)
+
+    def __iter__(self):
+        return (GameRecord(self, row) for row in range(self._length))
+
+    def dates(self):
+        return sorted(self._by_date)
+
+    def teams(self):
+        return sorted(self._by_team)
+
+    def rows(self, date=None, team=None):
+        # positions of the games on `date` and/or involving `team`
+        rows = np.arange(self._length, dtype=np.int32)
+        empty = np.empty(0, dtype=np.int32)
+        if date is not None:
+            rows = self._by_date.get(date, empty)
+        if team is not None:
+            rows = np.intersect1d(rows, self._by_team.get(team, empty))
+        return rows
+
+    def lookup(self, date=None, team=None):
+        return [GameRecord(self, row) for row in self.rows(date, team).tolist()]
+
+    def nbytes(self):
+        # bytes held by the column buffers and indexes (distinct values are
+        # counted by reference, as they are shared)
+        size = 0
+        for values, mask in self._numbers.values():
+            size += values.nbytes + (mask.nbytes if mask is not None else 0)
+        for codes, uniques in self._codes.values():
+            size += codes.nbytes + sys.getsizeof(uniques)
+        for index in (self._by_date, self._by_team):
+            size += sum(rows.nbytes for rows in index.values())
+        return size
+
+    def to_pandas(self):
+        # a DataFrame over the table's buffers: numbers become NumPy or
+        # nullable columns and coded columns categoricals, without copying.
+        # Codes come from factorize or a categorical and are already in
+        # pandas' code dtype, so they are handed over unvalidated
+        cols = {}
+        for col in self.columns:
+            if col in self._codes:
+                codes, uniques = self._codes[col]
+                dtype = pd.CategoricalDtype(pd.Index(uniques))
+                cols[col] = pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+            else:
+                values, mask = self._numbers[col]
+                if mask is None:
+                    cols[col] = values
+                elif values.dtype.kind == "f":
+                    cols[col] = pd.arrays.FloatingArray(values, mask)
+                else:
+                    cols[col] = pd.arrays.IntegerArray(values, mask)
+        return pd.DataFrame(cols, columns=self.columns, copy=False)
+
+    def to_arrow(self):
+        # a pyarrow Table sharing the value buffers; coded columns become
+        # dictionary arrays
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("to_arrow needs pyarrow: pip install pyarrow")
+
+        arrays = []
+        for col in self.columns:
+            if col in self._codes:
+                codes, uniques = self._codes[col]
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(codes, mask=codes < 0), pa.array(list(uniques))
+                    )
+                )
+            else:
+                values, mask = self._numbers[col]
+                arrays.append(pa.array(values, mask=mask))
+        return pa.Table.from_arrays(arrays, names=self.columns)
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Sportsbookreview has scraper protection, so we need to set a user agent
+# to get around this.
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+# responses worth retrying; anything else fails straight away
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def _retry_after(r):
+    # seconds a 429/503 response asks us to wait, from a Retry-After of
+    # either seconds or an HTTP date; None if absent or unreadable
+    value = r.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class _HostLimiter:
+    # caps in-flight requests to one host and spaces their start times
+    def __init__(self, concurrency, interval):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.interval = interval
+        self.next_start = 0.0
+
+    def __enter__(self):
+        self.slots.acquire()
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def __exit__(self, *exc):
+        self.slots.release()
+
+
+class Fetcher:
+    # Requests time out after `timeout` seconds (connect, read) and are
+    # retried up to `retries` times on connection errors, timeouts and
+    # RETRY_STATUS responses, waiting as long as the response's Retry-After
+    # asks or else backoff * 2**attempt seconds (plus up to 50% jitter).
+    def __init__(
+        self,
+        max_workers=8,
+        per_host=4,
+        interval=0.25,
+        headers=None,
+        timeout=(10, 60),
+        retries=3,
+        backoff=1.0,
+    ):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.interval = interval
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS if headers is None else headers)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = _HostLimiter(self.per_host, self.interval)
+            return self._limiters[host]
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            wait = None
+            try:
+                with self._limiter(url):
+                    r = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+            else:
+                if last or r.status_code not in RETRY_STATUS:
+                    r.raise_for_status()
+                    return r
+                wait = _retry_after(r)
+            if wait is None:
+                wait = self.backoff * 2**attempt * random.uniform(1, 1.5)
+            time.sleep(wait)
+
+    def _get(self, url, headers, return_exceptions):
+        try:
+            return self.get(url, headers=headers)
+        except requests.RequestException as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    def fetch_all(self, urls, headers=None, return_exceptions=False):
+        # responses come back in the same order as urls; headers, if given,
+        # holds extra request headers for each url. With return_exceptions a
+        # failed request leaves its exception in place of the response
+        # instead of failing the whole batch
+        urls = list(urls)
+        headers = list(headers) if headers is not None else [None] * len(urls)
+        get = lambda u, h: self._get(u, h, return_exceptions)
+        if len(urls) <= 1:
+            return [get(url, h) for url, h in zip(urls, headers)]
+        with ThreadPoolExecutor(min(self.max_workers, len(urls))) as pool:
+            return list(pool.map(get, urls, headers))
+
+    def close(self):
+        self.session.close()
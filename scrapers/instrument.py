@@ -0,0 +1,56 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+@contextmanager
+def span(spans, season, stage, profiler=None):
+    # times the block and appends {season, stage, seconds, ...} to spans; the
+    # yielded dict can be given extra fields such as row counts
+    record = {"season": season, "stage": stage}
+    if profiler is not None:
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+        spans.append(record)
+
+
+class Instrumentation:
+    # Per-season stage spans and run counters of a scraper. Every span is
+    # passed to each hook as it is recorded, so callers can log or export
+    # them while a run is still going. An optional cProfile.Profile is
+    # enabled around the parse, reformat and schema stages.
+    def __init__(self, hooks=(), profiler=None):
+        self.hooks = list(hooks)
+        self.profiler = profiler
+        self.spans = []
+        self.counters = Counter()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def record(self, record):
+        self.spans.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def count(self, name, n=1):
+        if n:
+            self.counters[name] += n
+
+    def report(self):
+        stages = {}
+        for record in self.spans:
+            total = stages.setdefault(record["stage"], {"seasons": 0, "seconds": 0.0})
+            total["seasons"] += 1
+            total["seconds"] += record["seconds"]
+        return {
+            "stages": stages,
+            "counters": dict(self.counters),
+            "spans": self.spans,
+        }
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# dtypes of every column enrich() can add, for typed output
+METRIC_DTYPES = {
+    "ML_H_cl_prob": "float32",
+    "ML_A_cl_prob": "float32",
+    "ML_cl_hold": "float32",
+    "ML_H_cl_novig": "float32",
+    "ML_A_cl_novig": "float32",
+    "ML_H_prob_move": "float32",
+    "S_H_move": "float32",
+    "S_cl_hold": "float32",
+    "OU_move": "float32",
+    "OU_cl_hold": "float32",
+    "margin": "Int16",
+    "total_score": "Int16",
+    "H_ATS": "Int8",
+    "OU_result": "Int8",
+}
+
+
+def _num(col):
+    return pd.to_numeric(col, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def implied_prob(odds):
+    # American odds -> implied probability; anything that isn't a valid
+    # price (|odds| < 100, blank, "NL") is NaN
+    odds = _num(odds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fav = -odds / (100 - odds)
+        dog = 100 / (odds + 100)
+    return np.where(odds <= -100, fav, np.where(odds >= 100, dog, np.nan))
+
+
+def _hold(home, away):
+    return implied_prob(home) + implied_prob(away) - 1
+
+
+def _result(diff):
+    # 1 when diff > 0, -1 when diff < 0, 0 for a push, NaN when unknown
+    return pd.array(np.sign(diff), dtype="Float64").astype("Int8")
+
+
+def enrich(df, roles):
+    # adds the betting metrics of a schema frame as new columns; `roles`
+    # (a Sport's metrics) names the columns playing each part:
+    #
+    # ml, ml_open        (home, away) closing / opening moneylines
+    # spread, spread_open  home closing / opening spread (run or puck line)
+    # spread_odds        (home, away) closing spread prices
+    # total, total_open  closing / opening total
+    # total_odds         (over, under) closing total prices
+    # score              (home, away) final scores
+    # zero_is_missing    spreads and totals of 0 mean no line was posted
+    # total_zero_is_missing  only totals of 0 do (a 0 spread is a pick'em)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = _metrics(df, roles)
+    df = df.copy()
+    for col, values in out.items():
+        dtype = METRIC_DTYPES[col]
+        df[col] = values if dtype.startswith("Int") else np.asarray(values, dtype=dtype)
+    return df
+
+
+def _metrics(df, roles):
+    out = {}
+    h_ml, a_ml = roles["ml"]
+    p_home = implied_prob(df[h_ml])
+    p_away = implied_prob(df[a_ml])
+    book = p_home + p_away
+    out["ML_H_cl_prob"] = p_home
+    out["ML_A_cl_prob"] = p_away
+    out["ML_cl_hold"] = book - 1
+    out["ML_H_cl_novig"] = p_home / book
+    out["ML_A_cl_novig"] = p_away / book
+    if "ml_open" in roles:
+        h_open, a_open = roles["ml_open"]
+        out["ML_H_prob_move"] = out["ML_H_cl_novig"] - (
+            implied_prob(df[h_open]) / (implied_prob(df[h_open]) + implied_prob(df[a_open]))
+        )
+
+    def line(col, total=False):
+        values = _num(df[col])
+        if roles.get("zero_is_missing") or (total and roles.get("total_zero_is_missing")):
+            values = np.where(values == 0, np.nan, values)
+        return values
+
+    spread = line(roles["spread"])
+    total = line(roles["total"], total=True)
+    if "spread_open" in roles:
+        out["S_H_move"] = spread - line(roles["spread_open"])
+    if "spread_odds" in roles:
+        out["S_cl_hold"] = _hold(df[roles["spread_odds"][0]], df[roles["spread_odds"][1]])
+    out["OU_move"] = total - line(roles["total_open"], total=True)
+    if "total_odds" in roles:
+        out["OU_cl_hold"] = _hold(df[roles["total_odds"][0]], df[roles["total_odds"][1]])
+
+    home, away = (_num(df[c]) for c in roles["score"])
+    margin = home - away
+    points = home + away
+    out["margin"] = pd.array(margin, dtype="Float64").astype("Int16")
+    out["total_score"] = pd.array(points, dtype="Float64").astype("Int16")
+    out["H_ATS"] = _result(margin + spread)
+    out["OU_result"] = _result(points - total)
+    return out
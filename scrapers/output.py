@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from scrapers.store import OddsStore
+
+FORMATS = ("csv", "json", "jsonl", "parquet", "feather", "sqlite")
+# written as a directory of sport=<sport>/season=<season> partitions
+PARTITIONED = ("parquet", "feather")
+
+
+def output_path(filename, fmt):
+    if fmt in PARTITIONED:
+        return f"data/{filename}"
+    if fmt == "sqlite":
+        return f"data/{filename}.db"
+    return f"data/{filename}.{fmt}"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("parquet and feather output need pyarrow: pip install pyarrow")
+
+
+def _to_int(col, dtype):
+    values = pd.to_numeric(col, errors="coerce")
+    info = np.iinfo(dtype.lower())
+    # fall back to a wider type rather than wrap around on odd values
+    if values.min() < info.min or values.max() > info.max:
+        dtype = "Int32"
+    return values.round().astype(dtype)
+
+
+def apply_dtypes(df, dtypes):
+    # cast a schema frame to the compact column types in `dtypes`
+    df = df.copy()
+    for col, dtype in dtypes.items():
+        if col not in df:
+            continue
+        if dtype == "date":
+            dates = pd.to_datetime(df[col], format="%Y-%m-%d", errors="coerce")
+            df[col] = dates.astype("date32[pyarrow]")
+        elif dtype == "category":
+            df[col] = df[col].where(df[col].map(lambda x: isinstance(x, str))).astype("category")
+        elif dtype.lower().startswith("int"):
+            df[col] = _to_int(df[col], dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def as_schema(df, dtypes):
+    # a frame read back from any output format in the types a scraper builds
+    # its schema frames in: numbers cast by `dtypes`, dates as YYYY-MM-DD
+    # strings and categories as plain strings
+    df = apply_dtypes(df, dtypes)
+    for col, dtype in dtypes.items():
+        if col in df and dtype in ("date", "category"):
+            df[col] = df[col].astype("str")
+    return df
+
+
+def partition_path(path, fmt, sport, season):
+    return os.path.join(path, f"sport={sport}", f"season={season}", f"part-0.{fmt}")
+
+
+def _write_partition(df, path, fmt, sport, dtypes):
+    _require_pyarrow()
+    for season, frame in df.groupby("season", sort=False):
+        target = partition_path(path, fmt, sport, season)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        frame = apply_dtypes(frame, dtypes).drop(columns="season").reset_index(drop=True)
+        if fmt == "parquet":
+            frame.to_parquet(target, index=False)
+        else:
+            # uncompressed so readers can memory-map the file
+            frame.to_feather(target, compression="uncompressed")
+
+
+def read_partitioned(path, fmt, sport=None, seasons=None):
+    # load a partitioned output, optionally only some of its partitions
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="ipc" if fmt == "feather" else fmt, partitioning="hive")
+    expr = None
+    if sport is not None:
+        expr = ds.field("sport") == sport
+    if seasons is not None:
+        cond = ds.field("season").isin(list(seasons))
+        expr = cond if expr is None else expr & cond
+    df = dataset.to_table(filter=expr).to_pandas()
+    df["season"] = df["season"].astype("int16")
+    return df[["season", *(c for c in df.columns if c not in ("season", "sport"))]]
+
+
+def read_output(path, fmt, sport=None):
+    if fmt == "sqlite":
+        store = OddsStore(path, read_only=True)
+        try:
+            return store.games(sport)
+        finally:
+            store.close()
+    if fmt in PARTITIONED:
+        return read_partitioned(path, fmt)
+    if fmt == "csv":
+        return pd.read_csv(path)
+    # keep the values exactly as they were written
+    return pd.read_json(
+        path, orient="records", lines=fmt == "jsonl", dtype=False, convert_dates=False
+    )
+
+
+def write_output(df, path, fmt, sport=None, dtypes=None):
+    if fmt == "sqlite":
+        store = OddsStore(path)
+        try:
+            store.upsert(sport, df, dtypes)
+        finally:
+            store.close()
+        return
+    if fmt in PARTITIONED:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        _write_partition(df, path, fmt, sport, dtypes or {})
+        return
+    tmp = path + ".tmp"
+    if fmt == "csv":
+        df.to_csv(tmp, index=False)
+    elif fmt == "jsonl":
+        df.to_json(tmp, orient="records", lines=True)
+    else:
+        df.to_json(tmp, orient="records")
+    os.replace(tmp, path)
+
+
+class SeasonWriter:
+    # Writes one season frame at a time straight to `path`, flushing after
+    # each one so that seasons already written survive a failed run. JSON
+    # output is a single records array written in chunks; it is closed even
+    # when the run fails part way. Partitioned formats write one file per
+    # season and sqlite upserts each season in its own transaction.
+    def __init__(self, path, fmt, sport=None, dtypes=None):
+        self.path = path
+        self.fmt = fmt
+        self.sport = sport
+        self.dtypes = dtypes or {}
+        self.rows = 0
+        self.f = None
+        self.store = None
+        if fmt == "sqlite":
+            self.store = OddsStore(path)
+            return
+        if fmt in PARTITIONED:
+            _require_pyarrow()
+            return
+        self.f = open(path, "w", newline="")
+        if fmt == "json":
+            self.f.write("[")
+
+    def write(self, df):
+        if df.empty:
+            return
+        if self.store is not None:
+            self.store.upsert(self.sport, df, self.dtypes)
+        elif self.f is None:
+            _write_partition(df, self.path, self.fmt, self.sport, self.dtypes)
+        elif self.fmt == "csv":
+            df.to_csv(self.f, index=False, header=self.rows == 0)
+        elif self.fmt == "jsonl":
+            lines = df.to_json(orient="records", lines=True)
+            self.f.write(lines if lines.endswith("\n") else lines + "\n")
+        else:
+            if self.rows:
+                self.f.write(",")
+            self.f.write(df.to_json(orient="records")[1:-1])
+        self.rows += len(df)
+        if self.f is not None:
+            self.f.flush()
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+        if self.f is None or self.f.closed:
+            return
+        if self.fmt == "json":
+            self.f.write("]")
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def manifest_path(path):
+    return path + ".manifest.json"
+
+
+def quarantine_path(path):
+    return path + ".quarantine.csv"
+
+
+def changes_path(path):
+    return path + ".changes.jsonl"
+
+
+def read_manifest(path, sport):
+    # season -> raw page hash recorded the last time `path` was written
+    if not os.path.isfile(manifest_path(path)):
+        return {}
+    with open(manifest_path(path), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("sport") != sport:
+        return {}
+    return {int(k): v for k, v in manifest["seasons"].items()}
+
+
+def write_manifest(path, sport, hashes):
+    seasons = {**read_manifest(path, sport), **hashes}
+    with open(manifest_path(path), "w") as f:
+        json.dump({"sport": sport, "seasons": {str(k): v for k, v in sorted(seasons.items())}}, f, indent=1)
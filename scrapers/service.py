@@ -0,0 +1,222 @@
+import copy
+import http.server
+import json
+import random
+import threading
+import time
+import traceback
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from scrapers.cache import RawCache
+from scrapers.compact import GameTable
+from scrapers.fetch import Fetcher
+from scrapers.sports import get_sport
+from scrapers.sportsbookreview import OddsScraper
+from scrapers.changes import change_records, diff_games, write_changes
+
+
+class OddsService:
+    # Long-running refresh of each sport's live season. Scrapers, their
+    # translation tables, the HTTP session and the raw page cache stay warm
+    # between refreshes; a refresh whose page hash is unchanged costs one
+    # conditional GET, and only games that changed are written to the store
+    # and, as change records, appended to the `changes` JSON lines file.
+    # Each sport's latest games are held as a compact GameTable, which the
+    # HTTP API looks games up in.
+    # Refreshes are spaced `interval` seconds apart with +/- `jitter` of
+    # random spread; failures are retried after `retry` seconds, doubling up
+    # to `max_retry`. Unless `season` pins it, each refresh works out the
+    # sport's current season and moves on to a new one when it starts.
+    def __init__(
+        self,
+        sports,
+        store=None,
+        changes=None,
+        season=None,
+        interval=900,
+        jitter=0.1,
+        retry=60,
+        max_retry=3600,
+        fetcher=None,
+        cache=None,
+        naming="nickname",
+    ):
+        self.fetcher = fetcher if fetcher is not None else Fetcher()
+        self.cache = cache if cache is not None else RawCache()
+        self.store = store
+        self.changes = changes
+        self.season = season
+        self.naming = naming
+        self.interval = interval
+        self.jitter = jitter
+        self.retry = retry
+        self.max_retry = max_retry
+        self.scrapers = {}
+        self.tables = {}
+        self.status = {}
+        self.due = {}
+        for sport in sports:
+            spec = get_sport(sport)
+            current = self._current(spec)
+            self.scrapers[spec.name] = self._scraper(spec.name, current)
+            self.tables[spec.name] = self._stored(self.scrapers[spec.name], current)
+            self.status[spec.name] = {"season": current, "failures": 0}
+            self.due[spec.name] = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current(self, spec):
+        # the pinned season, else the one being played today
+        if self.season is not None:
+            return self.season
+        return spec.current_season(date.today())
+
+    def _scraper(self, sport, season):
+        return OddsScraper(
+            sport, [season], fetcher=self.fetcher, cache=self.cache, naming=self.naming
+        )
+
+    def _roll_over(self, sport):
+        # starts on a new season once it begins: a fresh scraper, and the
+        # season's games as far as the store has them. Earlier seasons stay
+        # in the store as they were last refreshed
+        season = self._current(get_sport(sport))
+        if season == self.scrapers[sport].seasons[0]:
+            return
+        scraper = self._scraper(sport, season)
+        table = self._stored(scraper, season)
+        self.scrapers[sport] = scraper
+        with self._lock:
+            self.tables[sport] = table
+            self.status[sport]["season"] = season
+
+    def _stored(self, scraper, season):
+        # the season as last written to the store, so that the first refresh
+        # after a restart only reports and writes what changed since
+        empty = scraper._combine([])
+        frame = empty
+        if self.store is not None:
+            stored = self.store.games(scraper.sport, seasons=[season])
+            if not stored.empty:
+                frame = stored.reindex(columns=empty.columns)
+        return GameTable(frame, scraper.dtypes)
+
+    def table(self, sport):
+        # the live season as of the last successful refresh
+        with self._lock:
+            return self.tables[get_sport(sport).name]
+
+    def latest(self, sport):
+        return self.table(sport).to_pandas()
+
+    def refresh(self, sport):
+        # returns the number of games inserted, updated or deleted
+        sport = get_sport(sport).name
+        self._roll_over(sport)
+        scraper = self.scrapers[sport]
+        old = self.tables[sport].to_pandas()
+        # update() compares against the hashes it is given, so pass the
+        # ones from the previous refresh before it overwrites them
+        frame, stale = scraper.update(old, dict(scraper.hashes))
+        if not stale:
+            return 0
+        table = GameTable(frame, scraper.dtypes)
+        diff = diff_games(old, table.to_pandas())
+        if self.store is not None:
+            upserts = pd.concat([diff["insert"], diff["update"]]).reset_index()
+            upserts = upserts[[*table.columns, "game_no"]]
+            self.store.upsert(sport, upserts, scraper.dtypes)
+            self.store.delete(sport, diff["delete"].index.to_frame(index=False))
+        if self.changes is not None:
+            write_changes(self.changes, change_records(sport, diff))
+        with self._lock:
+            self.tables[sport] = table
+        return sum(len(diff[op]) for op in ("insert", "update", "delete"))
+
+    def status_snapshot(self):
+        # a copy of `status` that the refresh thread won't change under you
+        with self._lock:
+            return copy.deepcopy(self.status)
+
+    def _spread(self, seconds):
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run_due(self, sport):
+        status = self.status[sport]
+        try:
+            changed = self.refresh(sport)
+        except Exception as e:
+            with self._lock:
+                status["failures"] += 1
+                status["error"] = repr(e)
+            wait = min(self.max_retry, self.retry * 2 ** (status["failures"] - 1))
+            self.due[sport] = time.monotonic() + self._spread(wait)
+            print(f"{sport}: refresh failed, retrying in {wait}s")
+            traceback.print_exc()
+            return
+        with self._lock:
+            status["failures"] = 0
+            status.pop("error", None)
+            status["refreshed"] = time.time()
+            status["changed"] = changed
+        self.due[sport] = time.monotonic() + self._spread(self.interval)
+        if changed:
+            print(f"{sport} {status['season']}: {changed} games changed")
+
+    def run(self):
+        # refreshes sports as they come due until stop() is called
+        while not self._stop.is_set():
+            sport = min(self.due, key=self.due.get)
+            wait = self.due[sport] - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            self._run_due(sport)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    # GET /status, or GET /<sport> for the latest games as JSON records,
+    # narrowed down with ?date=YYYY-MM-DD and/or ?team=<name>
+    service = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        name = url.path.strip("/").lower()
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if name == "status":
+            body = json.dumps(self.service.status_snapshot()).encode()
+        elif name in self.service.scrapers:
+            games = self.service.table(name).lookup(query.get("date"), query.get("team"))
+            body = json.dumps([game.to_dict() for game in games]).encode()
+        else:
+            self._send(404, json.dumps({"error": f"unknown sport {name!r}"}).encode())
+            return
+        self._send(200, body)
+
+
+def serve_http(service, host="127.0.0.1", port=8765):
+    # local JSON API over `service`; call serve_forever() on the result
+    handler = type("Handler", (_Handler,), {"service": service})
+    return http.server.ThreadingHTTPServer((host, port), handler)
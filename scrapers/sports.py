@@ -0,0 +1,581 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+ARCHIVE = "https://www.sportsbookreviewsonline.com/scoresoddsarchives/"
+
+
+class Sport:
+    # Declarative description of one sport's odds archive, run by OddsScraper:
+    #
+    # base, ext        season url is base + season string + ext
+    # season_format    "span" for 2019-20 style pages, "year" for 2019
+    # season_strings   per-season overrides of the season string
+    # reader           "html" or "xlsx"
+    # date_window      months that fall in the season's first calendar year
+    # date_windows     per-season overrides of date_window
+    # season_start     month a span season starts in; before it, the current
+    #                  season is the one that started the year before
+    # eras             [(first season, {field: source column or None})]; the
+    #                  last era starting at or before a season applies and
+    #                  None fills the field with 0
+    # clean            {field: "token" | "numeric"} blacklist cleaning
+    # transforms       {field: fn(column)} applied after extraction
+    # fillna           value for missing cells before pairing, or None
+    # columns          {output: (side, field[, cast])} in output order; cast
+    #                  is "int" or "team" and None marks a derived column
+    # derive           fn(away, home) -> {output: values} for derived columns
+    # derive_fields    fields derive reads
+    # checks           [(reason, fn(away, home, out) -> bool mask per game,
+    #                  drop, fields and outputs fn reads)] run on every paired
+    #                  season after PAIR_CHECKS; flagged games go to the
+    #                  quarantine table and are left out of the output when
+    #                  drop is set
+    # metrics          {role: output column(s)} used by metrics.enrich
+    # dtypes           {output: dtype} for typed (parquet / feather) output
+    def __init__(
+        self,
+        name,
+        base,
+        eras,
+        columns,
+        dtypes,
+        ext="",
+        season_format="span",
+        season_strings=None,
+        reader="html",
+        date_window=(8, 12),
+        date_windows=None,
+        season_start=8,
+        clean=None,
+        transforms=None,
+        fillna=None,
+        derive=None,
+        derive_fields=(),
+        checks=(),
+        metrics=None,
+    ):
+        self.name = name
+        self.base = base
+        self.eras = sorted(eras, key=lambda era: era[0])
+        self.columns = columns
+        self.dtypes = dtypes
+        self.ext = ext
+        self.season_format = season_format
+        self.season_strings = season_strings or {}
+        self.reader = reader
+        self.date_window = date_window
+        self.date_windows = date_windows or {}
+        self.season_start = season_start
+        self.clean = clean or {}
+        self.transforms = transforms or {}
+        self.fillna = fillna
+        self.derive = derive
+        self.derive_fields = derive_fields
+        self.checks = [*PAIR_CHECKS, *checks]
+        self.metrics = metrics
+
+    def season_string(self, season):
+        if season in self.season_strings:
+            return self.season_strings[season]
+        if self.season_format == "year":
+            return str(season)
+        yr = str(season)[2:]
+        return f"{season}-{int(yr) + 1}"
+
+    def is_final(self, season, year):
+        # a season is finished once the calendar year it ends in is over
+        last = season + 1 if self.season_format == "span" else season
+        return year > last
+
+    def fields(self, season):
+        layout = self.eras[0][1]
+        for first, era in self.eras:
+            if season >= first:
+                layout = era
+        return layout
+
+    def window(self, season):
+        return self.date_windows.get(season, self.date_window)
+
+    def current_season(self, today):
+        # the season being played (or last played) on `today`
+        if self.season_format == "span" and today.month < self.season_start:
+            return today.year - 1
+        return today.year
+
+
+SPORTS = {}
+
+
+def register(sport):
+    SPORTS[sport.name] = sport
+    return sport
+
+
+def get_sport(name):
+    try:
+        return SPORTS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Invalid sport. Must be one of {', '.join(SPORTS)}.")
+
+
+def _nfl_lines(away, home):
+    # the smaller opening number is the spread, the larger one the total;
+    # spreads are then signed from the home side using the moneyline favourite
+    home_ml = home["close_ml"].astype("int64")
+    away_ml = away["close_ml"].astype("int64")
+
+    odds1 = away["open_odds"].astype(float)
+    odds2 = home["open_odds"].astype(float)
+    away_first = (odds1 < odds2).to_numpy()
+    a_close = away["close_odds"].astype(float)
+    h_close = home["close_odds"].astype(float)
+    a_2h = away["2H_odds"].astype(float)
+    h_2h = home["2H_odds"].astype(float)
+
+    open_spread = np.where(away_first, odds1, odds2)
+    S_cl_line = np.where(away_first, a_close, h_close)
+    h2_spread = np.where(away_first, a_2h, h_2h)
+
+    home_fav = (home_ml < away_ml).to_numpy()
+    home_open_spread = np.where(home_fav, -open_spread, open_spread)
+    S_H_cl_line = np.where(home_fav, -S_cl_line, S_cl_line)
+    h2_home_spread = np.where(home_fav, -h2_spread, h2_spread)
+
+    return {
+        "ML_H_cl_odds": home_ml,
+        "ML_A_cl_odds": away_ml,
+        "home_open_spread": home_open_spread,
+        "away_open_spread": -home_open_spread,
+        "S_H_cl_line": S_H_cl_line,
+        "S_A_cl_line": -S_H_cl_line,
+        "home_2H_spread": h2_home_spread,
+        "away_2H_spread": -h2_home_spread,
+        "2H_total": np.where(away_first, h_2h, a_2h),
+        "OU_op_line": np.where(away_first, odds2, odds1),
+        "OU_cl_line": np.where(away_first, h_close, a_close),
+    }
+
+
+def _pitcher_name(col):
+    is_str = col.map(lambda x: isinstance(x, str))
+    text = col.where(is_str, "").astype(str)
+    name = text.where(~text.str.contains("-L|-R", regex=True), text.str[:-2])
+    return name.astype(object).where(is_str, None)
+
+
+def _pitcher_hand(col):
+    is_str = col.map(lambda x: isinstance(x, str))
+    text = col.where(is_str, "").astype(str)
+    hand = pd.Series(np.where(text.str.contains("-L", regex=False), "L", "R"), index=col.index)
+    return hand.astype(object).where(is_str, None)
+
+
+def _is_number(col):
+    # dtype=bool: an empty column would otherwise come back as an object array
+    return col.astype(object).map(lambda x: isinstance(x, (int, float))).to_numpy(dtype=bool)
+
+
+def _date_mismatch(away, home, out):
+    return (away["date"] != home["date"]).to_numpy()
+
+
+# every sport: a game whose two rows are from different days means the page
+# is misaligned, so the pairing can't be trusted
+PAIR_CHECKS = [("away and home rows have different dates", _date_mismatch, True, ("date",))]
+
+
+# checks are built with partial rather than closures so that specs still
+# pickle into parse workers
+
+
+def _missing_ml(home_col, away_col, away, home, out):
+    return ((out[home_col] == 0) | (out[away_col] == 0)).to_numpy()
+
+
+def _not_inverse(col, away, home, out):
+    a_line = pd.to_numeric(away[col], errors="coerce")
+    h_line = pd.to_numeric(home[col], errors="coerce")
+    return (a_line != -h_line).to_numpy()
+
+
+def _not_numbers(cols, away, home, out):
+    ok = np.ones(len(out), dtype=bool)
+    for col in cols:
+        ok &= _is_number(away[col]) & _is_number(home[col])
+    return ~ok
+
+
+def _differs(col, away, home, out):
+    return (away[col] != home[col]).to_numpy()
+
+
+MLB_CHECKS = [
+    (
+        "invalid ML odds",
+        partial(_not_numbers, ["open_ml", "close_ml"]),
+        False,
+        ("open_ml", "close_ml"),
+    ),
+    (
+        "run line values should be additive inverses",
+        partial(_not_inverse, "S_cl_line"),
+        False,
+        ("S_cl_line",),
+    ),
+    ("invalid spread odds", partial(_not_numbers, ["S_cl_odds"]), False, ("S_cl_odds",)),
+    (
+        "opening total differs between over and under",
+        partial(_differs, "OU_op_line"),
+        True,
+        ("OU_op_line",),
+    ),
+    (
+        "closing total differs between over and under",
+        partial(_differs, "OU_cl_line"),
+        True,
+        ("OU_cl_line",),
+    ),
+    (
+        "invalid OU odds",
+        partial(_not_numbers, ["OU_op_odds", "OU_cl_odds"]),
+        False,
+        ("OU_op_odds", "OU_cl_odds"),
+    ),
+]
+
+
+def _scores(parts):
+    columns = {}
+    for part in parts:
+        columns[f"home_{part}"] = ("home", part)
+        columns[f"away_{part}"] = ("away", part)
+    return columns
+
+
+def _football_basketball(name, base, season_start):
+    return Sport(
+        name,
+        base=base,
+        season_start=season_start,
+        eras=[(0, {
+            "name": 3,
+            "1stQtr": 4,
+            "2ndQtr": 5,
+            "3rdQtr": 6,
+            "4thQtr": 7,
+            "final": 8,
+            "open_odds": 9,
+            "close_odds": 10,
+            "close_ml": 11,
+            "2H_odds": 12,
+        })],
+        clean={"open_odds": "token", "close_odds": "token", "2H_odds": "token"},
+        fillna=0,
+        columns={
+            "season": ("away", "season"),
+            "date": ("away", "date"),
+            "home_team": ("home", "name", "team"),
+            "away_team": ("away", "name", "team"),
+            **_scores(["1stQtr", "2ndQtr", "3rdQtr", "4thQtr", "final"]),
+            "ML_H_cl_odds": None,
+            "ML_A_cl_odds": None,
+            "home_open_spread": None,
+            "away_open_spread": None,
+            "S_H_cl_line": None,
+            "S_A_cl_line": None,
+            "home_2H_spread": None,
+            "away_2H_spread": None,
+            "2H_total": None,
+            "OU_op_line": None,
+            "OU_cl_line": None,
+        },
+        derive=_nfl_lines,
+        derive_fields=("open_odds", "close_odds", "close_ml", "2H_odds"),
+        checks=[(
+            "missing closing moneyline",
+            partial(_missing_ml, "ML_H_cl_odds", "ML_A_cl_odds"),
+            False,
+            ("ML_H_cl_odds", "ML_A_cl_odds"),
+        )],
+        metrics={
+            "ml": ("ML_H_cl_odds", "ML_A_cl_odds"),
+            "spread": "S_H_cl_line",
+            "spread_open": "home_open_spread",
+            "total": "OU_cl_line",
+            "total_open": "OU_op_line",
+            "score": ("home_final", "away_final"),
+            # a total of 0 is a missing line, a spread of 0 a pick'em
+            "total_zero_is_missing": True,
+        },
+        dtypes={
+            "season": "int16",
+            "date": "date",
+            "home_team": "category",
+            "away_team": "category",
+            "home_1stQtr": "Int16",
+            "away_1stQtr": "Int16",
+            "home_2ndQtr": "Int16",
+            "away_2ndQtr": "Int16",
+            "home_3rdQtr": "Int16",
+            "away_3rdQtr": "Int16",
+            "home_4thQtr": "Int16",
+            "away_4thQtr": "Int16",
+            "home_final": "Int16",
+            "away_final": "Int16",
+            "ML_H_cl_odds": "Int16",
+            "ML_A_cl_odds": "Int16",
+            "home_open_spread": "float32",
+            "away_open_spread": "float32",
+            "S_H_cl_line": "float32",
+            "S_A_cl_line": "float32",
+            "home_2H_spread": "float32",
+            "away_2H_spread": "float32",
+            "2H_total": "float32",
+            "OU_op_line": "float32",
+            "OU_cl_line": "float32",
+        },
+    )
+
+
+NFL = register(_football_basketball("nfl", ARCHIVE + "nfl-odds-", season_start=9))
+NBA = register(_football_basketball("nba", ARCHIVE + "nba-odds-", season_start=10))
+
+NHL = register(Sport(
+    "nhl",
+    base=ARCHIVE + "nhl-odds-",
+    # compensate for the COVID shortened season in 2021
+    season_strings={2020: "2021"},
+    date_windows={2020: (1, 3)},
+    season_start=10,
+    eras=[
+        (0, {
+            "name": 3,
+            "1stPeriod": 4,
+            "2ndPeriod": 5,
+            "3rdPeriod": 6,
+            "final": 7,
+            "open_ml": 8,
+            "close_ml": 9,
+            "S_cl_line": None,
+            "S_cl_odds": None,
+            "OU_op_line": 10,
+            "OU_op_odds": 11,
+            "OU_cl_line": 12,
+            "OU_cl_odds": 13,
+        }),
+        # puck lines were added in 2014
+        (2014, {
+            "name": 3,
+            "1stPeriod": 4,
+            "2ndPeriod": 5,
+            "3rdPeriod": 6,
+            "final": 7,
+            "open_ml": 8,
+            "close_ml": 9,
+            "S_cl_line": 10,
+            "S_cl_odds": 11,
+            "OU_op_line": 12,
+            "OU_op_odds": 13,
+            "OU_cl_line": 14,
+            "OU_cl_odds": 15,
+        }),
+    ],
+    clean={
+        "open_ml": "token",
+        "close_ml": "token",
+        "S_cl_line": "numeric",
+        "S_cl_odds": "numeric",
+        "OU_op_line": "numeric",
+        "OU_op_odds": "numeric",
+        "OU_cl_line": "numeric",
+        "OU_cl_odds": "numeric",
+    },
+    fillna=0,
+    columns={
+        "season": ("away", "season"),
+        "date": ("away", "date"),
+        "home_team": ("home", "name", "team"),
+        "away_team": ("away", "name", "team"),
+        **_scores(["1stPeriod", "2ndPeriod", "3rdPeriod", "final"]),
+        "ML_H_op_odds": ("home", "open_ml", "int"),
+        "ML_A_op_odds": ("away", "open_ml", "int"),
+        "ML_H_cl_odds": ("home", "close_ml", "int"),
+        "ML_A_cl_odds": ("away", "close_ml", "int"),
+        "S_H_cl_line": ("home", "S_cl_line"),
+        "S_A_cl_line": ("away", "S_cl_line"),
+        "S_H_cl_odds": ("home", "S_cl_odds"),
+        "S_A_cl_odds": ("away", "S_cl_odds"),
+        "OU_op_line": ("home", "OU_op_line"),
+        "OU_op_odds": ("home", "OU_op_odds"),
+        "OU_cl_line": ("home", "OU_cl_line"),
+        "OU_cl_odds": ("home", "OU_cl_odds"),
+    },
+    checks=[
+        (
+            "missing closing moneyline",
+            partial(_missing_ml, "ML_H_cl_odds", "ML_A_cl_odds"),
+            False,
+            ("ML_H_cl_odds", "ML_A_cl_odds"),
+        ),
+        (
+            "puck line values should be additive inverses",
+            partial(_not_inverse, "S_cl_line"),
+            False,
+            ("S_cl_line",),
+        ),
+    ],
+    metrics={
+        "ml": ("ML_H_cl_odds", "ML_A_cl_odds"),
+        "ml_open": ("ML_H_op_odds", "ML_A_op_odds"),
+        "spread": "S_H_cl_line",
+        "spread_odds": ("S_H_cl_odds", "S_A_cl_odds"),
+        "total": "OU_cl_line",
+        "total_open": "OU_op_line",
+        "score": ("home_final", "away_final"),
+        # no puck lines before 2014
+        "zero_is_missing": True,
+    },
+    dtypes={
+        "season": "int16",
+        "date": "date",
+        "home_team": "category",
+        "away_team": "category",
+        "home_1stPeriod": "Int8",
+        "away_1stPeriod": "Int8",
+        "home_2ndPeriod": "Int8",
+        "away_2ndPeriod": "Int8",
+        "home_3rdPeriod": "Int8",
+        "away_3rdPeriod": "Int8",
+        "home_final": "Int8",
+        "away_final": "Int8",
+        "ML_H_op_odds": "Int16",
+        "ML_A_op_odds": "Int16",
+        "ML_H_cl_odds": "Int16",
+        "ML_A_cl_odds": "Int16",
+        "S_H_cl_line": "float32",
+        "S_A_cl_line": "float32",
+        "S_H_cl_odds": "Int16",
+        "S_A_cl_odds": "Int16",
+        "OU_op_line": "float32",
+        "OU_op_odds": "Int16",
+        "OU_cl_line": "float32",
+        "OU_cl_odds": "Int16",
+    },
+))
+
+_INNINGS = ["1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th"]
+
+MLB = register(Sport(
+    "mlb",
+    base="https://www.sportsbookreviewsonline.com/wp-content/uploads/sportsbookreviewsonline_com_737/mlb-odds-",
+    ext=".xlsx",
+    season_format="year",
+    reader="xlsx",
+    date_window=(3, 11),
+    eras=[
+        (0, {
+            "team": 3,
+            "pName": 4,
+            "pThrow": 4,
+            **{f"{inn}Inn": 5 + i for i, inn in enumerate(_INNINGS)},
+            "final": 14,
+            "open_ml": 15,
+            "close_ml": 16,
+            "S_cl_line": None,
+            "S_cl_odds": None,
+            "OU_op_line": 17,
+            "OU_op_odds": 18,
+            "OU_cl_line": 19,
+            "OU_cl_odds": 20,
+        }),
+        # run lines were added in 2014
+        (2014, {
+            "team": 3,
+            "pName": 4,
+            "pThrow": 4,
+            **{f"{inn}Inn": 5 + i for i, inn in enumerate(_INNINGS)},
+            "final": 14,
+            "open_ml": 15,
+            "close_ml": 16,
+            "S_cl_line": 17,
+            "S_cl_odds": 18,
+            "OU_op_line": 19,
+            "OU_op_odds": 20,
+            "OU_cl_line": 21,
+            "OU_cl_odds": 22,
+        }),
+    ],
+    transforms={"pName": _pitcher_name, "pThrow": _pitcher_hand},
+    columns={
+        "season": ("away", "season"),
+        "date": ("away", "date"),
+        "a_name": ("away", "team", "team"),
+        "h_name": ("home", "team", "team"),
+        "a_final": ("away", "final"),
+        "h_final": ("home", "final"),
+        "a_SP": ("away", "pName"),
+        "a_thr": ("away", "pThrow"),
+        "h_SP": ("home", "pName"),
+        "h_thr": ("home", "pThrow"),
+        **{f"a_i{i + 1}": ("away", f"{inn}Inn") for i, inn in enumerate(_INNINGS)},
+        **{f"h_i{i + 1}": ("home", f"{inn}Inn") for i, inn in enumerate(_INNINGS)},
+        "a_ML_op": ("away", "open_ml"),
+        "h_ML_op": ("home", "open_ml"),
+        "a_ML_cl": ("away", "close_ml"),
+        "h_ML_cl": ("home", "close_ml"),
+        "a_S_cl_line": ("away", "S_cl_line"),
+        "a_S_cl_odds": ("away", "S_cl_odds"),
+        "h_S_cl_line": ("home", "S_cl_line"),
+        "h_S_cl_odds": ("home", "S_cl_odds"),
+        "OU_op_line": ("away", "OU_op_line"),
+        "O_op_odds": ("away", "OU_op_odds"),
+        "U_op_odds": ("home", "OU_op_odds"),
+        "OU_cl_line": ("away", "OU_cl_line"),
+        "O_cl_odds": ("away", "OU_cl_odds"),
+        "U_cl_odds": ("home", "OU_cl_odds"),
+    },
+    checks=MLB_CHECKS,
+    metrics={
+        "ml": ("h_ML_cl", "a_ML_cl"),
+        "ml_open": ("h_ML_op", "a_ML_op"),
+        "spread": "h_S_cl_line",
+        "spread_odds": ("h_S_cl_odds", "a_S_cl_odds"),
+        "total": "OU_cl_line",
+        "total_open": "OU_op_line",
+        "total_odds": ("O_cl_odds", "U_cl_odds"),
+        "score": ("h_final", "a_final"),
+        # no run lines before 2014
+        "zero_is_missing": True,
+    },
+    dtypes={
+        "season": "int16",
+        "date": "date",
+        "a_name": "category",
+        "h_name": "category",
+        "a_final": "Int8",
+        "h_final": "Int8",
+        "a_SP": "category",
+        "a_thr": "category",
+        "h_SP": "category",
+        "h_thr": "category",
+        **{f"a_i{i}": "Int8" for i in range(1, 10)},
+        **{f"h_i{i}": "Int8" for i in range(1, 10)},
+        "a_ML_op": "Int16",
+        "h_ML_op": "Int16",
+        "a_ML_cl": "Int16",
+        "h_ML_cl": "Int16",
+        "a_S_cl_line": "float32",
+        "a_S_cl_odds": "Int16",
+        "h_S_cl_line": "float32",
+        "h_S_cl_odds": "Int16",
+        "OU_op_line": "float32",
+        "O_op_odds": "Int16",
+        "U_op_odds": "Int16",
+        "OU_cl_line": "float32",
+        "O_cl_odds": "Int16",
+        "U_cl_odds": "Int16",
+    },
+))
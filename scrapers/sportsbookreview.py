@@ -1,573 +1,499 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import requests
+import hashlib
+import importlib.util
+import numpy as np
 import pandas as pd
-from itertools import tee
-import json
 import io
-import os
+from scrapers.clean import BLACKLIST, clean_column, decode_dates
+from scrapers.fetch import Fetcher
+from scrapers.instrument import Instrumentation, span
+from scrapers.metrics import METRIC_DTYPES, enrich
+from scrapers.output import as_schema
+from scrapers.sports import get_sport
+from scrapers.store import team_columns
+from scrapers.translate import Translator
+
+# use the fastest parser backends that are installed
+HTML_FLAVOR = "lxml" if importlib.util.find_spec("lxml") else "bs4"
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+
+def _read_html(content):
+    return pd.read_html(io.BytesIO(content), flavor=HTML_FLAVOR)[0]
+
 
 class OddsScraper:
-    def __init__(self, sport, years):
-        self.blacklist = [
-            "pk",
-            "PK",
-            "NL",
-            "nl",
-            "a100",
-            "a100",
-            "a105",
-            "a105",
-            "a110",
-            "a110",
-            ".5+03",
-            ".5ev",
-            "-",
-        ]
-        self.sport = sport
-        self.translator = json.load(open("config/translated.json", "r"))
+    def __init__(
+        self,
+        sport,
+        years,
+        fetcher=None,
+        cache=None,
+        workers=1,
+        naming="nickname",
+        hooks=(),
+        checkpoint=None,
+        enrich=False,
+        columns=None,
+        teams=None,
+        dates=None,
+    ):
+        self.blacklist = list(BLACKLIST)
+        self.spec = get_sport(sport)
+        self.sport = self.spec.name
+        self.base = self.spec.base
+        # add derived betting metrics (see scrapers.metrics) to every season
+        self.enrich = enrich and self.spec.metrics is not None
+        self.schema = list(self.spec.columns)
+        # outputs built by _to_schema and fields extracted by _reformat_data;
+        # narrower than the full schema when `columns` is given
+        self._outputs = self.schema
+        self._fields = None
+        if columns is not None:
+            self._project(columns)
+        self.dtypes = {c: t for c, t in self.spec.dtypes.items() if c in self.schema}
+        if self.enrich:
+            self.dtypes = {**self.dtypes, **METRIC_DTYPES}
+        # only games involving one of `teams` (as named in the output) and
+        # played within `dates`, a (first, last) pair of YYYY-MM-DD strings
+        # either of which may be None, are kept
+        self.teams = list(teams) if teams is not None else None
+        self.dates = dates
+        self.translator = Translator(sport, naming)
         self.seasons = years
+        self.fetcher = fetcher if fetcher is not None else Fetcher()
+        self.cache = cache
+        # number of processes used to parse seasons
+        self.workers = workers
+        # sha256 of each season's raw page, filled in as seasons are downloaded
+        self.hashes = {}
+        # season -> column -> counts of cells blacklisted or coerced
+        self.cleaned = {}
+        self._cleaning = {}
+        # page row (the header is row 0) of each reformatted row, and field ->
+        # mask of the rows with a cell that couldn't be read as a number
+        self._page_rows = None
+        self._coerced = {}
+        # season -> validation reason -> number of games flagged
+        self.warnings = {}
+        # season -> games that failed a validation check, see _validate
+        self.quarantine = {}
+        self.instrument = Instrumentation(hooks)
+        # finished seasons are saved here and skipped when resuming
+        self.checkpoint = checkpoint
+
+    def __getstate__(self):
+        # parse workers only need the parsing state, not the network side
+        state = self.__dict__.copy()
+        state["fetcher"] = None
+        state["cache"] = None
+        state["instrument"] = None
+        state["checkpoint"] = None
+        return state
+
+    def _project(self, columns):
+        # output only `columns` plus the season, date and team columns, and
+        # only extract and pair what those, the checks and the metrics read
+        spec = self.spec
+        unknown = [c for c in columns if c not in spec.columns]
+        if unknown:
+            raise ValueError(
+                f"Unknown {self.sport} columns: {', '.join(unknown)}. "
+                f"Must be among {', '.join(spec.columns)}."
+            )
+        keys = {"season", "date", *team_columns(spec.columns)}
+        self.schema = [c for c in spec.columns if c in keys or c in columns]
+        needs = {name for _, _, _, reads in spec.checks for name in reads}
+        if self.enrich:
+            for cols in spec.metrics.values():
+                if isinstance(cols, str):
+                    needs.add(cols)
+                elif isinstance(cols, tuple):
+                    needs.update(cols)
+        wanted = set(self.schema) | needs
+        self._outputs = [c for c in spec.columns if c in wanted]
+        fields = {n for n in needs if n not in spec.columns}
+        for out in self._outputs:
+            source = spec.columns[out]
+            if source is None:
+                fields.update(spec.derive_fields)
+            else:
+                fields.add(source[1])
+        self._fields = fields
 
     def _translate(self, name):
-        return self.translator[self.sport].get(name, name)
+        return self.translator.get(name)
 
-    @staticmethod
-    def _make_season(season):
-        season = str(season)
-        yr = season[2:]
-        next_yr = str(int(yr) + 1)
-        return f"{season}-{next_yr}"
-
-    @staticmethod
-    def _make_datestr(date, season, start=8, yr_end=12):
-        date = str(date)
-        if len(date) == 3:
-          date = f"0{date}"
-        month = date[:2]
-        day = date[2:]
-
-        if int(month) in range(start, yr_end + 1):
-          datecode = f"{season}{month}{day}"
-        else:
-          datecode = f"{int(season+1)}{month}{day}"
-        dt_object = datetime.strptime(datecode, '%Y%m%d').date()
-        return dt_object.strftime('%Y-%m-%d')
+    def _clean(self, name, col, numeric=False):
+        col, counts, masks = clean_column(col, numeric, self.blacklist)
+        if counts["blacklisted"] or counts["coerced"]:
+            rows = {f"{kind}_rows": self._page_rows[mask].tolist() for kind, mask in masks.items()}
+            self._cleaning[name] = {**counts, **rows}
+        if counts["coerced"]:
+            self._coerced[name] = masks["coerced"]
+        return col
 
     @staticmethod
-    def _pairwise(iterable):
-        a, b = tee(iterable)
-        next(b, None)
-        return zip(a, b)
-
-    def driver(self):
-        df = pd.DataFrame()
-        for season in self.seasons:
-            season_str = self._make_season(season)
-            url = self.base + season_str
-
-            # Sportsbookreview has scraper protection, so we need to set a user agent
-            # to get around this.
-            headers = {"User-Agent": "Mozilla/5.0"}
-            r = requests.get(url, headers=headers)
+    def _split_pairs(df):
+        # each game spans two consecutive rows, away then home
+        n = len(df) // 2 * 2
+        away = df.iloc[0:n:2].reset_index(drop=True)
+        home = df.iloc[1:n:2].reset_index(drop=True)
+        return away, home
+
+    def _translate_col(self, names):
+        return self.translator.translate(names)
+
+    def _build_schema(self, cols):
+        # object columns go through a list so pandas infers their dtype the
+        # same way it does for a schema built up row by row
+        cols = {
+            k: v.tolist() if getattr(v, "dtype", None) == object else v
+            for k, v in cols.items()
+        }
+        return pd.DataFrame(cols, columns=self._outputs)
 
-            dfs = pd.read_html(r.text)
-            df = pd.concat([df, self._reformat_data(dfs[0][1:], season)], axis=0)
-        return self._to_schema(df)
+    def _season_url(self, season):
+        return self.base + self.spec.season_string(season) + self.spec.ext
 
+    def _season_final(self, season):
+        return self.spec.is_final(season, datetime.now().year)
 
-class NFLOddsScraper(OddsScraper):
-    def __init__(self, years):
-        super().__init__("nfl", years)
-        self.base = (
-            "https://www.sportsbookreviewsonline.com/scoresoddsarchives/nfl-odds-"
-        )
-        self.schema = {
-            "season": [],
-            "date": [],
-            "home_team": [],
-            "away_team": [],
-            "home_1stQtr": [],
-            "away_1stQtr": [],
-            "home_2ndQtr": [],
-            "away_2ndQtr": [],
-            "home_3rdQtr": [],
-            "away_3rdQtr": [],
-            "home_4thQtr": [],
-            "away_4thQtr": [],
-            "home_final": [],
-            "away_final": [],
-            "ML_H_cl_odds": [],
-            "ML_A_cl_odds": [],
-            "home_open_spread": [],
-            "away_open_spread": [],
-            "S_H_cl_line": [],
-            "S_A_cl_line": [],
-            "home_2H_spread": [],
-            "away_2H_spread": [],
-            "2H_total": [],
-            "OU_op_line": [],
-            "OU_cl_line": [],
-        }
+    def _read(self, content):
+        if self.spec.reader == "xlsx":
+            return pd.read_excel(
+                io.BytesIO(content), header=None, sheet_name="Sheet1", engine=EXCEL_ENGINE
+            )
+        return _read_html(content)
+
+    def _keep(self, df, dates, layout):
+        # rows of the games played within self.dates and involving one of
+        # self.teams, found before any other field is extracted; a game's
+        # date is that of its away row
+        n = len(df) // 2 * 2
+        keep = np.ones(n // 2, dtype=bool)
+        if self.dates is not None:
+            first, last = self.dates
+            game_dates = dates.to_numpy()[0:n:2]
+            if first is not None:
+                keep &= game_dates >= first
+            if last is not None:
+                keep &= game_dates <= last
+        if self.teams is not None:
+            field = self.spec.columns[team_columns(self.spec.columns)[0]][1]
+            names = self._translate_col(df[layout[field]]).to_numpy()
+            keep &= np.isin(names[0:n:2], self.teams) | np.isin(names[1:n:2], self.teams)
+        rows = np.zeros(len(df), dtype=bool)
+        rows[:n] = np.repeat(keep, 2)
+        return rows
 
     def _reformat_data(self, df, season):
-        new_df = pd.DataFrame()
-        new_df["season"] = [season] * len(df)
-        new_df["date"] = df[0].apply(lambda x: self._make_datestr(x, season))
-        new_df["name"] = df[3]
-        new_df["1stQtr"] = df[4]
-        new_df["2ndQtr"] = df[5]
-        new_df["3rdQtr"] = df[6]
-        new_df["4thQtr"] = df[7]
-        new_df["final"] = df[8]
-        _open = df[9].apply(lambda x: 0 if x in self.blacklist else x)
-        new_df["open_odds"] = _open
-        close = df[10].apply(lambda x: 0 if x in self.blacklist else x)
-        new_df["close_odds"] = close
-        new_df["close_ml"] = df[11]
-        h2 = df[12].apply(lambda x: 0 if x in self.blacklist else x)
-        new_df["2H_odds"] = h2
+        spec = self.spec
+        self._page_rows = df.index.to_numpy()
+        self._coerced = {}
+        df = df.reset_index(drop=True)
+        start, yr_end = spec.window(season)
+        dates = decode_dates(df[0], season, start=start, yr_end=yr_end)
+        layout = spec.fields(season)
+        if self.teams is not None or self.dates is not None:
+            rows = self._keep(df, dates, layout)
+            df = df[rows].reset_index(drop=True)
+            dates = dates[rows].reset_index(drop=True)
+            self._page_rows = self._page_rows[rows]
+        if df.empty:
+            # every game was filtered out (or the page has none)
+            fields = [f for f in layout if self._fields is None or f in self._fields]
+            return pd.DataFrame(columns=["season", "date", *fields])
+        new_df = pd.DataFrame(index=df.index)
+        new_df["season"] = season
+        new_df["date"] = dates
+        for field, col in layout.items():
+            if self._fields is not None and field not in self._fields:
+                continue
+            values = df[col] if col is not None else pd.Series(0, index=df.index)
+            if field in spec.transforms:
+                values = spec.transforms[field](values)
+            if field in spec.clean:
+                values = self._clean(field, values, numeric=spec.clean[field] == "numeric")
+            new_df[field] = values
         return new_df
 
+    def _pair(self, df):
+        if self.spec.fillna is not None:
+            df = df.fillna(self.spec.fillna)
+        return self._split_pairs(df)
+
     def _to_schema(self, df):
-        new_df = self.schema.copy()
-        df = df.fillna(0)
-        progress = df.iterrows()
-        # remove the first row, as it is the header
-        next(progress)
-        for (i1, row), (i2, next_row) in self._pairwise(progress):
-            # skip every other row
-            if i1 % 2 == 0:
+        spec = self.spec
+        away, home = self._pair(df)
+        sides = {"away": away, "home": home}
+
+        cols = {}
+        for out in self._outputs:
+            source = spec.columns[out]
+            if source is None:
                 continue
-
-            home_ml = int(next_row["close_ml"])
-            away_ml = int(row["close_ml"])
-
-            odds1 = float(row["open_odds"])
-            odds2 = float(next_row["open_odds"])
-            if odds1 < odds2:
-                open_spread = odds1
-                S_cl_line = float(row["close_odds"])
-                h2_spread = float(row["2H_odds"])
-
-                h2_total = float(next_row["2H_odds"])
-                open_ou = odds2
-                close_ou = float(next_row["close_odds"])
-            else:
-                open_spread = odds2
-                S_cl_line = float(next_row["close_odds"])
-                h2_spread = float(next_row["2H_odds"])
-
-                h2_total = float(row["2H_odds"])
-                open_ou = odds1
-                close_ou = float(row["close_odds"])
-
-            home_open_spread = -open_spread if home_ml < away_ml else open_spread
-            away_open_spread = -home_open_spread
-            S_H_cl_line = -S_cl_line if home_ml < away_ml else S_cl_line
-            S_A_cl_line = -S_H_cl_line
-            h2_home_spread = -h2_spread if home_ml < away_ml else h2_spread
-            h2_away_spread = -h2_home_spread
-
-            new_df["season"].append(row["season"])
-            new_df["date"].append(row["date"])
-            new_df["home_team"].append(self._translate(next_row["name"]))
-            new_df["away_team"].append(self._translate(row["name"]))
-            new_df["home_1stQtr"].append(next_row["1stQtr"])
-            new_df["away_1stQtr"].append(row["1stQtr"])
-            new_df["home_2ndQtr"].append(next_row["2ndQtr"])
-            new_df["away_2ndQtr"].append(row["2ndQtr"])
-            new_df["home_3rdQtr"].append(next_row["3rdQtr"])
-            new_df["away_3rdQtr"].append(row["3rdQtr"])
-            new_df["home_4thQtr"].append(next_row["4thQtr"])
-            new_df["away_4thQtr"].append(row["4thQtr"])
-            new_df["home_final"].append(next_row["final"])
-            new_df["away_final"].append(row["final"])
-            new_df["ML_H_cl_odds"].append(home_ml)
-            new_df["ML_A_cl_odds"].append(away_ml)
-            new_df["home_open_spread"].append(home_open_spread)
-            new_df["away_open_spread"].append(away_open_spread)
-            new_df["S_H_cl_line"].append(S_H_cl_line)
-            new_df["S_A_cl_line"].append(S_A_cl_line)
-            new_df["home_2H_spread"].append(h2_home_spread)
-            new_df["away_2H_spread"].append(h2_away_spread)
-            new_df["2H_total"].append(h2_total)
-            new_df["OU_op_line"].append(open_ou)
-            new_df["OU_cl_line"].append(close_ou)
-
-        return pd.DataFrame(new_df)
-
-
-# NBA is the same as NFL, so we can subclass the NFL scraper
-class NBAOddsScraper(NFLOddsScraper):
-    def __init__(self, years):
-        super().__init__(years)
-        self.sport = "nba"
-        self.base = (
-            "https://www.sportsbookreviewsonline.com/scoresoddsarchives/nba-odds-"
-        )
-        self.schema = {
-            "season": [],
-            "date": [],
-            "home_team": [],
-            "away_team": [],
-            "home_1stQtr": [],
-            "away_1stQtr": [],
-            "home_2ndQtr": [],
-            "away_2ndQtr": [],
-            "home_3rdQtr": [],
-            "away_3rdQtr": [],
-            "home_4thQtr": [],
-            "away_4thQtr": [],
-            "home_final": [],
-            "away_final": [],
-            "ML_H_cl_odds": [],
-            "ML_A_cl_odds": [],
-            "home_open_spread": [],
-            "away_open_spread": [],
-            "S_H_cl_line": [],
-            "S_A_cl_line": [],
-            "home_2H_spread": [],
-            "away_2H_spread": [],
-            "2H_total": [],
-            "OU_op_line": [],
-            "OU_cl_line": [],
-        }
-
-
-# NHL is the same as NFL, so we can subclass the NFL scraper
-class NHLOddsScraper(OddsScraper):
-    def __init__(self, years):
-        super().__init__("nhl", years)
-        self.base = (
-            "https://www.sportsbookreviewsonline.com/scoresoddsarchives/nhl-odds-"
-        )
-        self.schema = {
-            "season": [],
-            "date": [],
-            "home_team": [],
-            "away_team": [],
-            "home_1stPeriod": [],
-            "away_1stPeriod": [],
-            "home_2ndPeriod": [],
-            "away_2ndPeriod": [],
-            "home_3rdPeriod": [],
-            "away_3rdPeriod": [],
-            "home_final": [],
-            "away_final": [],
-            "ML_H_op_odds": [],
-            "ML_A_op_odds": [],
-            "ML_H_cl_odds": [],
-            "ML_A_cl_odds": [],
-            "S_H_cl_line": [],
-            "S_A_cl_line": [],
-            "S_H_cl_odds": [],
-            "S_A_cl_odds": [],
-            "OU_op_line": [],
-            "OU_op_odds": [],
-            "OU_cl_line": [],
-            "OU_cl_odds": [],
+            values = sides[source[0]][source[1]]
+            cast = source[2] if len(source) > 2 else None
+            if cast == "team":
+                values = self._translate_col(values)
+            elif cast == "int":
+                values = values.astype("int64")
+            cols[out] = values
+        if spec.derive is not None and any(spec.columns[out] is None for out in self._outputs):
+            derived = spec.derive(away, home)
+            cols.update({out: derived[out] for out in self._outputs if out in derived})
+
+        return self._build_schema(cols)
+
+    def _validate(self, df, games):
+        # runs every check of the sport over the whole season at once; games
+        # flagged by any check are listed in the returned quarantine table
+        # with their reasons, and those failing a drop check are taken out
+        # of the returned games. Games with a cell that couldn't be read as a
+        # number (see _clean) are flagged too, but kept
+        if games.empty:
+            quarantine = games.assign(
+                reason=pd.Series(dtype=object),
+                dropped=pd.Series(dtype=bool),
+                page_row=pd.Series(dtype="int64"),
+            )
+            return games, quarantine, {}
+        away, home = self._pair(df)
+        reasons = np.full(len(games), "", dtype=object)
+        drop = np.zeros(len(games), dtype=bool)
+        counts = {}
+        results = [
+            (reason, check(away, home, games), drops)
+            for reason, check, drops, _ in self.spec.checks
+        ]
+        n = len(games)
+        for field, rows in self._coerced.items():
+            results.append((f"unreadable {field}", rows[0:2 * n:2] | rows[1:2 * n:2], False))
+        for reason, mask, drops in results:
+            mask = np.asarray(mask, dtype=bool)
+            if not mask.any():
+                continue
+            counts[reason] = int(mask.sum())
+            reasons[mask] += reason + "; "
+            if drops:
+                drop |= mask
+        flagged = reasons != ""
+        quarantine = games[flagged].reset_index(drop=True)
+        quarantine["reason"] = [r[:-2] for r in reasons[flagged]]
+        quarantine["dropped"] = drop[flagged]
+        # page row of the game's away row; its home row is the next one
+        quarantine["page_row"] = self._page_rows[0:2 * n:2][flagged]
+        if drop.any():
+            games = games[~drop].reset_index(drop=True)
+        return games, quarantine, counts
+
+    def _download(self, seasons, return_exceptions=False):
+        urls = [self._season_url(s) for s in seasons]
+        if self.cache is None:
+            responses = self.fetcher.fetch_all(urls, return_exceptions=return_exceptions)
+            contents = [r if isinstance(r, Exception) else r.content for r in responses]
+            outcomes = [
+                (None, 0.0) if isinstance(r, Exception) else (None, r.elapsed.total_seconds())
+                for r in responses
+            ]
+        else:
+            items = [(self.sport, s, url, self._season_final(s)) for s, url in zip(seasons, urls)]
+            contents = self.cache.fetch_all(self.fetcher, items, return_exceptions)
+            outcomes = self.cache.last
+        for season, content, (cache, seconds) in zip(seasons, contents, outcomes):
+            if not isinstance(content, Exception):
+                self._downloaded(season, content, cache, seconds)
+        return contents
+
+    def _downloaded(self, season, content, cache=None, seconds=0.0):
+        self.hashes[season] = hashlib.sha256(content).hexdigest()
+        self.instrument.record({
+            "season": season,
+            "stage": "download",
+            "seconds": seconds,
+            "bytes": len(content),
+            "cache": cache,
+        })
+        self.instrument.count("bytes", len(content))
+        if cache is not None:
+            self.instrument.count(f"cache_{cache}")
+
+    def _season_schema(self, content, season):
+        self._cleaning = {}
+        spans = []
+        # profiling only happens in-process, parse workers have no instrument
+        profiler = self.instrument.profiler if self.instrument is not None else None
+        with span(spans, season, "parse", profiler) as record:
+            # the first row of every page is its header
+            raw = self._read(content)[1:]
+            record["rows"] = len(raw)
+        with span(spans, season, "reformat", profiler):
+            df = self._reformat_data(raw, season)
+        with span(spans, season, "schema", profiler):
+            games = self._to_schema(df)
+        with span(spans, season, "validate", profiler) as record:
+            games, quarantine, counts = self._validate(df, games)
+            record["games"] = len(games)
+            record["quarantined"] = len(quarantine)
+        if self.enrich:
+            # computed once per season here, so the metrics are saved with
+            # checkpoints and kept by incremental runs
+            with span(spans, season, "enrich", profiler):
+                games = enrich(games, self.spec.metrics)
+        if self._fields is not None:
+            games = games[[c for c in games.columns if c in self.schema or c in METRIC_DTYPES]]
+        # carried back from parse workers, see _build
+        report = {
+            "unmapped": sorted(self.translator.unmapped),
+            "cleaned": self._cleaning,
+            "warnings": counts,
+            "quarantine": quarantine,
+            "spans": spans,
         }
+        return games, report
+
+    def unmapped_names(self):
+        # raw team names that passed through untranslated
+        return sorted(self.translator.unmapped)
+
+    def _build(self, seasons, contents):
+        # parsing is CPU bound, so seasons are spread over worker processes
+        for season, (df, report) in zip(seasons, self._run(seasons, contents)):
+            yield self._absorb(season, df, report)
+
+    def _absorb(self, season, df, report):
+        # takes in the report of a season built by _season_schema
+        self.translator.unmapped.update(report["unmapped"])
+        self.cleaned[season] = report["cleaned"]
+        self.warnings[season] = report["warnings"]
+        self.quarantine[season] = report["quarantine"]
+        for record in report["spans"]:
+            self.instrument.record(record)
+        for counts in self.cleaned[season].values():
+            self.instrument.count("blacklisted", counts["blacklisted"])
+            self.instrument.count("coerced", counts["coerced"])
+        self.instrument.count("warnings", sum(self.warnings[season].values()))
+        self.instrument.count("quarantined", len(report["quarantine"]))
+        self.instrument.count("dropped", int(report["quarantine"]["dropped"].sum()))
+        self.instrument.count("games", len(df))
+        return df
+
+    def _run(self, seasons, contents):
+        workers = min(self.workers, len(seasons))
+        if workers <= 1:
+            for content, season in zip(contents, seasons):
+                yield self._season_schema(content, season)
+            return
+        # keep at most one finished season per worker waiting to be consumed
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            for content, season in zip(contents, seasons):
+                pending.append(pool.submit(self._season_schema, content, season))
+                if len(pending) > workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _combine(self, frames):
+        frames = list(frames)
+        if not frames:
+            return pd.DataFrame(columns=list(self.schema))
+        return pd.concat(frames, axis=0, ignore_index=True)
+
+    def iter_seasons(self, seasons=None):
+        # yields (season, schema frame) one season at a time, in order
+        seasons = self.seasons if seasons is None else seasons
+        if self.checkpoint is not None:
+            yield from self._iter_checkpointed(seasons)
+            return
+        contents = self._download(seasons)
+        yield from zip(seasons, self._build(seasons, contents))
+
+    def _iter_checkpointed(self, seasons):
+        # seasons finished by an earlier run come from the checkpoint; each
+        # newly built season is saved as soon as it is done. Seasons that
+        # fail to download don't stop the others and are raised at the end
+        done = self.checkpoint.done()
+        todo = [s for s in seasons if s not in done]
+        contents = self._download(todo, return_exceptions=True)
+        failed = {s: c for s, c in zip(todo, contents) if isinstance(c, Exception)}
+        ok = [(s, c) for s, c in zip(todo, contents) if s not in failed]
+        built = self._run([s for s, _ in ok], [c for _, c in ok])
+
+        for season in seasons:
+            if season in failed:
+                continue
+            if season in done:
+                games, report, digest = self.checkpoint.load(season)
+                self.hashes[season] = digest
+                self.instrument.count("resumed")
+                yield season, self._absorb(season, games, {**report, "spans": []})
+                continue
+            games, report = next(built)
+            self.checkpoint.save(season, games, report, self.hashes[season])
+            yield season, self._absorb(season, games, report)
+
+        if failed:
+            raise RuntimeError(
+                f"seasons {sorted(failed)} failed to download; resume from "
+                f"{self.checkpoint.root} to retry only those"
+            ) from next(iter(failed.values()))
+
+    def quarantined(self):
+        # every quarantined game of the seasons built so far, with its reasons
+        frames = [q for q in self.quarantine.values() if len(q)]
+        if not frames:
+            return pd.DataFrame(columns=[*self._outputs, "reason", "dropped", "page_row"])
+        return pd.concat(frames, axis=0, ignore_index=True)
+
+    def scrape(self):
+        # the output and the quarantine table of every season
+        games = self._combine(frame for _, frame in self.iter_seasons())
+        return games, self.quarantined()
 
-    def _reformat_data(self, df, season, covid=False):
-        new_df = pd.DataFrame()
-        new_df["season"] = [season] * len(df)
-        new_df["date"] = df[0].apply(
-            lambda x: (
-                self._make_datestr(x, season)
-                if not covid
-                else self._make_datestr(x, season, start=1, yr_end=3)
-            )
-        )
-        new_df["name"] = df[3]
-        new_df["1stPeriod"] = df[4]
-        new_df["2ndPeriod"] = df[5]
-        new_df["3rdPeriod"] = df[6]
-        new_df["final"] = df[7]
-        new_df["open_ml"] = df[8]
-        new_df["open_ml"] = new_df["open_ml"].apply(
-            lambda x: 0 if x in self.blacklist else x
-        )
-        new_df["close_ml"] = df[9]
-        new_df["close_ml"] = new_df["close_ml"].apply(
-            lambda x: 0 if x in self.blacklist else x
-        )
-        new_df["S_cl_line"] = df[10] if season > 2013 else 0
-        new_df["S_cl_line"] = new_df["S_cl_line"].apply(
-            lambda x: 0 if x in self.blacklist else float(x)
-        )
-        new_df["S_cl_odds"] = df[11] if season > 2013 else 0
-        new_df["S_cl_odds"] = new_df["S_cl_odds"].apply(
-            lambda x: 0 if x in self.blacklist else float(x)
-        )
-        new_df["OU_op_line"] = df[12] if season > 2013 else df[10]
-        new_df["OU_op_line"] = new_df["OU_op_line"].apply(
-            lambda x: 0 if x in self.blacklist else float(x)
-        )
-        new_df["OU_op_odds"] = df[13] if season > 2013 else df[11]
-        new_df["OU_op_odds"] = new_df["OU_op_odds"].apply(
-            lambda x: 0 if x in self.blacklist else float(x)
-        )
-        new_df["OU_cl_line"] = df[14] if season > 2013 else df[12]
-        new_df["OU_cl_line"] = new_df["OU_cl_line"].apply(
-            lambda x: 0 if x in self.blacklist else float(x)
-        )
-        new_df["OU_cl_odds"] = df[15] if season > 2013 else df[13]
-        new_df["OU_cl_odds"] = new_df["OU_cl_odds"].apply(
-            lambda x: 0 if x in self.blacklist else float(x)
-        )
+    def driver(self):
+        return self.scrape()[0]
+
+    def update(self, existing, hashes):
+        # rebuild only the seasons whose raw page hash differs from `hashes`
+        # (or that are missing from `existing`) and splice them into it
+        have = set(existing["season"].unique()) if "season" in existing else set()
+        stale = []
+        contents = []
+        for season, content in zip(self.seasons, self._download(self.seasons)):
+            if season in have and hashes.get(season) == self.hashes[season]:
+                continue
+            stale.append(season)
+            contents.append(content)
 
-        return new_df
+        if not stale:
+            return existing, stale
+        # kept seasons may come from a typed output (dates as datetime.date,
+        # categories); cast them so each column holds one type after splicing
+        existing = as_schema(existing, self.dtypes)
+        keep = [existing[~existing["season"].isin(stale)]] if have else []
+        df = self._combine([*keep, *self._build(stale, contents)])
+        return df.sort_values("season", kind="stable", ignore_index=True), stale
 
-    def _to_schema(self, df):
-        new_df = self.schema.copy()
-        df = df.fillna(0)
-        progress = df.iterrows()
-        # remove the first row, as it is the header
-        next(progress)
-        for (i1, row), (i2, next_row) in self._pairwise(progress):
-            # skip every other row
-            if i1 % 2 == 0:
-              continue
-
-            new_df["season"].append(row["season"])
-            new_df["date"].append(row["date"])
-            new_df["home_team"].append(self._translate(next_row["name"]))
-            new_df["away_team"].append(self._translate(row["name"]))
-            new_df["home_1stPeriod"].append(next_row["1stPeriod"])
-            new_df["away_1stPeriod"].append(row["1stPeriod"])
-            new_df["home_2ndPeriod"].append(next_row["2ndPeriod"])
-            new_df["away_2ndPeriod"].append(row["2ndPeriod"])
-            new_df["home_3rdPeriod"].append(next_row["3rdPeriod"])
-            new_df["away_3rdPeriod"].append(row["3rdPeriod"])
-            new_df["home_final"].append(next_row["final"])
-            new_df["away_final"].append(row["final"])
-            new_df["ML_H_op_odds"].append(int(next_row["open_ml"]))
-            new_df["ML_A_op_odds"].append(int(row["open_ml"]))
-            new_df["ML_H_cl_odds"].append(int(next_row["close_ml"]))
-            new_df["ML_A_cl_odds"].append(int(row["close_ml"]))
-            new_df["S_H_cl_line"].append(next_row["S_cl_line"])
-            new_df["S_A_cl_line"].append(row["S_cl_line"])
-            new_df["S_H_cl_odds"].append(next_row["S_cl_odds"])
-            new_df["S_A_cl_odds"].append(row["S_cl_odds"])
-            new_df["OU_op_line"].append(next_row["OU_op_line"])
-            new_df["OU_op_odds"].append(next_row["OU_op_odds"])
-            new_df["OU_cl_line"].append(next_row["OU_cl_line"])
-            new_df["OU_cl_odds"].append(next_row["OU_cl_odds"])
-
-        return pd.DataFrame(new_df)
 
-    def driver(self):
-        dfs = pd.DataFrame()
-        for season in self.seasons:
-            # compensate for the COVID shortened season in 2021
-            season_str = self._make_season(season) if season != 2020 else "2021"
-            is_cov = True if season == 2020 else False
-            url = self.base + season_str
-
-            # Sportsbookreview has scraper protection, so we need to set a user agent
-            # to get around this.
-            headers = {"User-Agent": "Mozilla/5.0"}
-            r = requests.get(url, headers=headers)
-
-            dfs = pd.concat(
-                [dfs, self._reformat_data(pd.read_html(r.text)[0][1:], season, is_cov)],
-                axis=0,
-            )
+class NFLOddsScraper(OddsScraper):
+    def __init__(self, years, **kwargs):
+        super().__init__("nfl", years, **kwargs)
 
-        return self._to_schema(dfs)
 
+class NBAOddsScraper(OddsScraper):
+    def __init__(self, years, **kwargs):
+        super().__init__("nba", years, **kwargs)
 
-# MLB has a different format, so we need to subclass the OddsScraper
-class MLBOddsScraper(OddsScraper):
-    def __init__(self, years):
-        super().__init__("mlb", years)
-        self.base = "https://www.sportsbookreviewsonline.com/wp-content/uploads/sportsbookreviewsonline_com_737/mlb-odds-"
-        self.ext = ".xlsx"
-        self.schema = {
-          "season": [],
-          "date": [],
-          "a_name": [],
-          "h_name": [],
-          "a_final": [],
-          "h_final": [],
-          "a_SP": [],
-          "a_thr": [],
-          "h_SP": [],
-          "h_thr": [],
-          "a_i1": [],
-          "a_i2": [],
-          "a_i3": [],
-          "a_i4": [],
-          "a_i5": [],
-          "a_i6": [],
-          "a_i7": [],
-          "a_i8": [],
-          "a_i9": [],
-          "h_i1": [],
-          "h_i2": [],
-          "h_i3": [],
-          "h_i4": [],
-          "h_i5": [],
-          "h_i6": [],
-          "h_i7": [],
-          "h_i8": [],
-          "h_i9": [],
-          "a_ML_op": [],
-          "h_ML_op": [],
-          "a_ML_cl": [],
-          "h_ML_cl": [],
-          "a_S_cl_line": [],
-          "a_S_cl_odds": [],
-          "h_S_cl_line": [],
-          "h_S_cl_odds": [],
-          "OU_op_line": [],
-          "O_op_odds": [],
-          "U_op_odds": [],
-          "OU_cl_line": [],
-          "O_cl_odds": [],
-          "U_cl_odds": [],
-        }
 
-    def _reformat_data(self, df, season):
-      new_df = pd.DataFrame()
-      new_df["season"] = df[0].apply(lambda x: season)
-      new_df["date"] = df[0].apply(lambda x: self._make_datestr(x, season, start=3, yr_end=11))
-      new_df["team"] = df[3]
-      new_df["pName"] = df[4].apply(lambda x: \
-        None if (type(x) != str) \
-        else x[:-2] if ("-L" in x or "-R" in x) \
-        else x
-      )
-      new_df["pThrow"] = df[4].apply(lambda x: \
-        None if (type(x) != str) \
-        else 'L' if ("-L" in x) \
-        else 'R'
-      )
-      new_df["1stInn"] = df[5]
-      new_df["2ndInn"] = df[6]
-      new_df["3rdInn"] = df[7]
-      new_df["4thInn"] = df[8]
-      new_df["5thInn"] = df[9]
-      new_df["6thInn"] = df[10]
-      new_df["7thInn"] = df[11]
-      new_df["8thInn"] = df[12]
-      new_df["9thInn"] = df[13]
-      new_df["final"] = df[14]
-      new_df["open_ml"] = df[15]
-      new_df["close_ml"] = df[16]
-      new_df["S_cl_line"] = df[17] if season > 2013 else 0
-      new_df["S_cl_odds"] = df[18] if season > 2013 else 0
-      new_df["OU_op_line"] = df[19] if season > 2013 else df[17]
-      new_df["OU_op_odds"] = df[20] if season > 2013 else df[18]
-      new_df["OU_cl_line"] = df[21] if season > 2013 else df[19]
-      new_df["OU_cl_odds"] = df[22] if season > 2013 else df[20]
-
-      return new_df
+class NHLOddsScraper(OddsScraper):
+    def __init__(self, years, **kwargs):
+        super().__init__("nhl", years, **kwargs)
 
-    def _to_schema(self, df):
-      print('processing data for the requested seasons...')
-      new_df = self.schema.copy()
-      df = df.reset_index(drop=True)
-      for i in range(len(df)):
-        if i % 2 == 0:
-          row = df.loc[i+0]
-          next_row = df.loc[i+1]
-
-          away = self._translate(row["team"])
-          home = self._translate(next_row["team"])
-          new_df["season"].append(row["season"])
-          new_df["date"].append(row["date"])
-          new_df["a_name"].append(away)
-          new_df["h_name"].append(home)
-          new_df["a_final"].append(row["final"])
-          new_df["h_final"].append(next_row["final"])
-          new_df["a_SP"].append(row["pName"])
-          new_df["a_thr"].append(row["pThrow"])
-          new_df["h_SP"].append(next_row["pName"])
-          new_df["h_thr"].append(next_row["pThrow"])
-          new_df["a_i1"].append(row["1stInn"])
-          new_df["a_i2"].append(row["2ndInn"])
-          new_df["a_i3"].append(row["3rdInn"])
-          new_df["a_i4"].append(row["4thInn"])
-          new_df["a_i5"].append(row["5thInn"])
-          new_df["a_i6"].append(row["6thInn"])
-          new_df["a_i7"].append(row["7thInn"])
-          new_df["a_i8"].append(row["8thInn"])
-          new_df["a_i9"].append(row["9thInn"])
-          new_df["h_i1"].append(next_row["1stInn"])
-          new_df["h_i2"].append(next_row["2ndInn"])
-          new_df["h_i3"].append(next_row["3rdInn"])
-          new_df["h_i4"].append(next_row["4thInn"])
-          new_df["h_i5"].append(next_row["5thInn"])
-          new_df["h_i6"].append(next_row["6thInn"])
-          new_df["h_i7"].append(next_row["7thInn"])
-          new_df["h_i8"].append(next_row["8thInn"])
-          new_df["h_i9"].append(next_row["9thInn"])
-          new_df["a_ML_op"].append(row["open_ml"])
-          new_df["h_ML_op"].append(next_row["open_ml"])
-          new_df["a_ML_cl"].append(row["close_ml"])
-          new_df["h_ML_cl"].append(next_row["close_ml"])
-          new_df["a_S_cl_line"].append(row["S_cl_line"])
-          new_df["a_S_cl_odds"].append(row["S_cl_odds"])
-          new_df["h_S_cl_line"].append(next_row["S_cl_line"])
-          new_df["h_S_cl_odds"].append(next_row["S_cl_odds"])
-          new_df["OU_op_line"].append(row["OU_op_line"])
-          new_df["O_op_odds"].append(row["OU_op_odds"])
-          new_df["U_op_odds"].append(next_row["OU_op_odds"])
-          new_df["OU_cl_line"].append(row["OU_cl_line"])
-          new_df["O_cl_odds"].append(row["OU_cl_odds"])
-          new_df["U_cl_odds"].append(next_row["OU_cl_odds"])
-
-          assert row["date"] == next_row["date"], \
-            f'date mismatch; {away}@{home} on {row["date"]} vs. {next_row["date"]}; check row formatting'
-
-          if (not isinstance(row["open_ml"], (int, float)) or not isinstance(next_row["open_ml"], (int, float)) \
-              or not isinstance(row["close_ml"], (int, float)) or not isinstance(next_row["close_ml"], (int, float))):
-            print(f'WARNING: invalid ML odds found; {away}@{home} on {row["date"]}; Validate this entry manually:')
-            # print(pd.DataFrame(new_df).loc[[int(i/2)]]); print('')
-
-          if (row["S_cl_line"] != -1*next_row["S_cl_line"]):
-            print(f'WARNING: run line values should be additive inverses; {away}@{home} on {row["date"]}; Validate this entry manually:')
-            # print(pd.DataFrame(new_df).loc[[int(i/2)]]); print('')
-
-          if (not isinstance(row["S_cl_odds"], (int, float)) or not isinstance(next_row["S_cl_odds"], (int, float))):
-            print(f'WARNING: invalid spread odds found; {away}@{home} on {row["date"]}; Validate this entry manually:')
-            # print(pd.DataFrame(new_df).loc[[int(i/2)]]); print('')
-
-          assert row["OU_op_line"] == next_row["OU_op_line"], \
-            f'opening line mismatch; {away}@{home} on {row["date"]}; O={row["OU_op_line"]}, U={next_row["OU_op_line"]}'
-
-          assert row["OU_cl_line"] == next_row["OU_cl_line"], \
-            f'closing line mismatch; {away}@{home} on {row["date"]}; O={row["OU_cl_line"]}, U={next_row["OU_cl_line"]}'
-
-          if (not isinstance(row["OU_op_odds"], (int, float)) or not isinstance(next_row["OU_op_odds"], (int, float)) \
-              or not isinstance(row["OU_cl_odds"], (int, float)) or not isinstance(next_row["OU_cl_odds"], (int, float))):
-            print(f'WARNING: invalid OU odds found; {away}@{home} on {row["date"]}; Validate this entry manually:')
-            # print(pd.DataFrame(new_df).loc[[int(i/2)]]); print('')
-
-      print('set the following dataframe for the requested seasons:')
-      print(pd.DataFrame(new_df))
-      return pd.DataFrame(new_df)
 
-    def driver(self):
-      dfs = pd.DataFrame()
-      if not os.path.isdir('data/src'):
-          os.mkdir('data/src')
-      for season in self.seasons:
-        src_file = 'data/src/mlb-odds-%d.xlsx' % season
-        if os.path.isfile(src_file):
-          print('found %s, skipping download' % src_file)
-        else:
-          print('downloading %s' % src_file)
-          url = self.base + str(season) + self.ext
-          headers = {"User-Agent": "Mozilla/5.0"}
-          r = requests.get(url, headers=headers)
-          with open(src_file, "wb") as f:
-            f.write(r.content)
-
-        df = pd.read_excel(src_file, header=None, sheet_name=None)
-        print('opening %s for processing' % src_file)
-        dfs = pd.concat(
-          [dfs, self._reformat_data(df["Sheet1"][1:], season)], axis=0
-        )
-
-      return self._to_schema(dfs)
+class MLBOddsScraper(OddsScraper):
+    def __init__(self, years, **kwargs):
+        super().__init__("mlb", years, **kwargs)
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+KEY = ("date", "home", "away", "game_no")
+
+
+def team_columns(columns):
+    # (home, away) column names; MLB uses h_name/a_name
+    if "home_team" in columns:
+        return "home_team", "away_team"
+    return "h_name", "a_name"
+
+
+def with_game_no(df):
+    # numbers games sharing a date and teams in page order
+    home, away = team_columns(df.columns)
+    df = df.copy()
+    df["game_no"] = df.groupby(["date", home, away], sort=False).cumcount()
+    return df
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column(name, dtypes):
+    kind = dtypes.get(name, "")
+    affinity = "TEXT" if kind in ("category", "date", "") else "NUMERIC"
+    return f"{_q(name)} {affinity}"
+
+
+class OddsStore:
+    # SQLite store with one table per sport, holding that sport's schema
+    # columns plus game_no, which tells apart games with the same date and
+    # teams (MLB doubleheaders). Games are upserted on (date, home team,
+    # away team, game_no) and indexed for season/date ranges and team lookups.
+    def __init__(self, path="data/odds.db", read_only=False):
+        # may be handed to another thread (see OddsService), but is only
+        # ever used by one thread at a time. A read-only store must exist
+        # already; sqlite would otherwise create an empty file at `path`
+        if read_only:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"no database at {path}")
+            path = Path(path).resolve().as_uri() + "?mode=ro"
+        self.conn = sqlite3.connect(path, check_same_thread=False, uri=read_only)
+
+    def _columns(self, sport):
+        rows = self.conn.execute(f"PRAGMA table_info({_q(sport)})").fetchall()
+        return [r[1] for r in rows]
+
+    def _create(self, sport, columns, dtypes):
+        home, away = team_columns(columns)
+        cols = [_column(col, dtypes) for col in columns]
+        key = ", ".join(_q(c) for c in ("date", home, away, "game_no"))
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {_q(sport)} "
+            f"({', '.join(cols)}, game_no INTEGER NOT NULL, PRIMARY KEY ({key}))"
+        )
+        for name, cols in (
+            ("season_date", ("season", "date")),
+            ("date", ("date",)),
+            ("home", (home,)),
+            ("away", (away,)),
+        ):
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_q(f'{sport}_{name}')} "
+                f"ON {_q(sport)} ({', '.join(_q(c) for c in cols)})"
+            )
+
+    def upsert(self, sport, df, dtypes=None):
+        if df.empty:
+            return 0
+        # a subset of a season has to come with game_no already filled in
+        if "game_no" not in df.columns:
+            df = with_game_no(df)
+        existing = self._columns(sport)
+        if not existing:
+            self._create(sport, [c for c in df.columns if c != "game_no"], dtypes or {})
+        else:
+            # columns the table was created without, such as --enrich metrics
+            # added to an existing store
+            with self.conn:
+                for col in df.columns:
+                    if col not in existing:
+                        self.conn.execute(
+                            f"ALTER TABLE {_q(sport)} ADD COLUMN {_column(col, dtypes or {})}"
+                        )
+        df = df.astype(object).where(df.notna(), None)
+        cols = ", ".join(_q(c) for c in df.columns)
+        marks = ", ".join("?" * len(df.columns))
+        # only the columns given are overwritten, so upserting a projection
+        # (see --columns) leaves a stored game's other columns as they were
+        home, away = team_columns(df.columns)
+        key = ("date", home, away, "game_no")
+        update = ", ".join(f"{_q(c)} = excluded.{_q(c)}" for c in df.columns if c not in key)
+        action = f"DO UPDATE SET {update}" if update else "DO NOTHING"
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {_q(sport)} ({cols}) VALUES ({marks}) "
+                f"ON CONFLICT ({', '.join(_q(c) for c in key)}) {action}",
+                df.itertuples(index=False, name=None),
+            )
+        return len(df)
+
+    def delete(self, sport, keys):
+        # keys: frame of date, home team, away team and game_no
+        if keys.empty or not self._columns(sport):
+            return 0
+        home, away = team_columns(self._columns(sport))
+        where = " AND ".join(f"{_q(c)} = ?" for c in ("date", home, away, "game_no"))
+        rows = keys[["date", home, away, "game_no"]].astype(object)
+        with self.conn:
+            self.conn.executemany(
+                f"DELETE FROM {_q(sport)} WHERE {where}",
+                rows.itertuples(index=False, name=None),
+            )
+        return len(keys)
+
+    def games(self, sport, seasons=None, team=None, start=None, end=None, columns=None):
+        # games for `sport`, optionally limited to seasons, a team playing
+        # home or away, and an inclusive YYYY-MM-DD date range
+        if not self._columns(sport):
+            return pd.DataFrame()
+        home, away = team_columns(self._columns(sport))
+        where = []
+        params = []
+        if seasons is not None:
+            seasons = list(seasons)
+            where.append(f"season IN ({', '.join('?' * len(seasons))})")
+            params += seasons
+        if start is not None:
+            where.append("date >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("date <= ?")
+            params.append(end)
+        if team is not None:
+            where.append(f"({_q(home)} = ? OR {_q(away)} = ?)")
+            params += [team, team]
+        select = "*" if columns is None else ", ".join(_q(c) for c in columns)
+        sql = f"SELECT {select} FROM {_q(sport)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY date, game_no"
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        return df.drop(columns="game_no", errors="ignore")
+
+    def close(self):
+        self.conn.close()
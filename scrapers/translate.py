@@ -0,0 +1,45 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# naming scheme -> mapping file of raw sportsbookreview names per sport
+SCHEMES = {
+    "nickname": "config/translated.json",
+    "ysports": "config/translated-ysports.json",
+}
+
+
+@lru_cache(maxsize=None)
+def load_mapping(scheme):
+    # each mapping file is read once per process
+    if scheme not in SCHEMES:
+        raise ValueError(f"Invalid naming scheme. Must be one of {', '.join(SCHEMES)}.")
+    with open(SCHEMES[scheme], "r") as f:
+        return json.load(f)
+
+
+class Translator:
+    def __init__(self, sport, scheme="nickname"):
+        self.sport = sport
+        self.scheme = scheme
+        self.mapping = load_mapping(scheme).get(sport, {})
+        # schemes other than nickname only list the names they change, so
+        # the nickname file's raw names count as known too
+        self.known = set(self.mapping) | set(load_mapping("nickname").get(sport, {}))
+        # raw names seen that are in neither the mapping nor the known names
+        self.unmapped = set()
+
+    def get(self, name):
+        return self.mapping.get(name, name)
+
+    def translate(self, names):
+        # map each distinct name once, then broadcast back over the column
+        codes, uniques = pd.factorize(names)
+        uniques = list(uniques)
+        self.unmapped.update(
+            n for n in uniques if isinstance(n, str) and n not in self.known
+        )
+        table = np.array([self.get(n) for n in uniques] + [np.nan], dtype=object)
+        return pd.Series(table[codes], index=names.index)
@@ -0,0 +1,89 @@
+import http.server
+import os
+import threading
+from collections import Counter
+
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.fixtures import TABLES
+from scrapers.sports import get_sport
+from scrapers.sportsbookreview import OddsScraper
+
+
+@pytest.fixture
+def make_scraper():
+    # an OddsScraper that parses `table` (a synthetic page) in place of
+    # every downloaded page
+    def make(sport, table, years=(2016,), **kwargs):
+        scraper = OddsScraper(sport, list(years), **kwargs)
+        scraper._read = lambda content: table
+        return scraper
+
+    return make
+
+
+@pytest.fixture
+def mlb_season(make_scraper):
+    # (schema frame, dtypes) of a synthetic 2016 MLB season
+    def season(n_games=60, **kwargs):
+        scraper = make_scraper("mlb", synthetic.mlb_table(2016, n_games), **kwargs)
+        return scraper._season_schema(b"", 2016)[0], scraper.dtypes
+
+    return season
+
+
+class _Site(http.server.BaseHTTPRequestHandler):
+    # GET /<sport>/<page name> answers the page, or 503 while
+    # server.fail[<page name>] is above 0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        sport, name = self.path.strip("/").split("/", 1)
+        with server.lock:
+            server.hits[name] += 1
+            failing = server.fail[name] > 0
+            server.fail[name] -= failing
+        body = b"down" if failing else server.pages[sport, name]
+        self.send_response(503 if failing else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    # a local stand-in for the archive with synthetic season pages; the run
+    # works in tmp_path, so cli.py writes its data/ output there
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Site)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.pages = {}
+    server.hits = Counter()
+    server.fail = Counter()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    root = f"http://127.0.0.1:{server.server_port}"
+
+    def add(sport, season, n_games=40):
+        # serves `sport`'s synthetic season under the scraper's page name;
+        # returns that name
+        spec = get_sport(sport)
+        monkeypatch.setattr(spec, "base", f"{root}/{sport}/" + spec.base.rsplit("/", 1)[-1])
+        name = OddsScraper(sport, [season])._season_url(season).rsplit("/", 1)[-1]
+        server.pages[sport, name] = TABLES[sport](season, n_games).to_html(
+            header=False, index=False
+        ).encode()
+        return name
+
+    server.add = add
+    (tmp_path / "config").symlink_to(os.path.abspath("config"))
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    yield server
+    server.shutdown()
+    server.server_close()
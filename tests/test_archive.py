@@ -0,0 +1,26 @@
+import json
+
+from scrapers.archive import ArchiveReader
+
+
+def test_strings_with_braces_quotes_and_backslashes(tmp_path):
+    records = [
+        {"season": 2015, "date": 20150910.0, "home_team": "Patriots", "away_team": "Steelers",
+         "note": "ends in a backslash \\"},
+        {"season": 2015, "date": 20150913.0, "home_team": "Bears", "away_team": "Packers",
+         "note": "a \"quoted\" {brace} and \\\\ two"},
+        {"season": 2016, "date": 20160911.0, "home_team": "Jets", "away_team": "Bengals",
+         "note": "}{\\\"", "nested": {"a": {"b": "}"}}},
+    ]
+    path = tmp_path / "archive.json"
+    path.write_text(json.dumps(records, indent=1))
+
+    with ArchiveReader(str(path)) as reader:
+        raw = [json.loads(r) for r in reader._objects()]
+        games = reader.read()
+    assert raw == records
+    assert list(games["home_team"]) == ["Patriots", "Bears", "Jets"]
+    assert list(games["date"]) == ["2015-09-10", "2015-09-13", "2016-09-11"]
+
+    with ArchiveReader(str(path), seasons=[2016]) as reader:
+        assert list(reader.read()["away_team"]) == ["Bengals"]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from cli import main
+
+BATCH = [
+    "batch", "--manifest", "jobs.json", "--no-cache", "--parse-workers", "1",
+    "--http-retries", "0",
+]
+
+
+def _jobs(*jobs):
+    with open("jobs.json", "w") as f:
+        json.dump({"jobs": list(jobs)}, f)
+
+
+def _seasons(path):
+    with open(path) as f:
+        return sorted({g["season"] for g in json.load(f)})
+
+
+def test_failed_season_is_retried(site, capsys):
+    pages = [site.add("nhl", season) for season in (2015, 2016)]
+    site.fail[pages[0]] = 1
+    _jobs({"sport": "nhl", "start": 2015, "end": 2016, "filename": "nhl"})
+    main(BATCH)
+    assert site.hits[pages[0]] == 2
+    assert site.hits[pages[1]] == 1
+    assert "retrying 1 failed seasons" in capsys.readouterr().out
+    assert _seasons("data/nhl.json") == [2015, 2016]
+
+
+def test_failed_season_does_not_hold_back_the_rest(site, capsys):
+    nhl = [site.add("nhl", season) for season in (2015, 2016)]
+    nfl = site.add("nfl", 2016)
+    site.fail[nhl[1]] = 99
+    _jobs(
+        {"sport": "nhl", "start": 2015, "end": 2016, "filename": "nhl"},
+        {"sport": "nfl", "start": 2016, "end": 2016, "filename": "nfl"},
+    )
+    with pytest.raises(SystemExit) as raised:
+        main([*BATCH, "--retries", "1"])
+    assert raised.value.code == 1
+    # the first try and one retry
+    assert site.hits[nhl[1]] == 2
+    assert site.hits[nfl] == 1
+    assert "ERROR: nhl 2016 failed" in capsys.readouterr().out
+    assert _seasons("data/nhl.json") == [2015]
+    assert _seasons("data/nfl.json") == [2016]
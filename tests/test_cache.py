@@ -0,0 +1,123 @@
+import hashlib
+import http.server
+import os
+import threading
+
+import pytest
+
+from cli import main
+from scrapers.cache import RawCache
+from scrapers.fetch import Fetcher
+
+LAST_MODIFIED = "Sat, 01 Jun 2024 00:00:00 GMT"
+
+
+class _Pages(http.server.BaseHTTPRequestHandler):
+    # GET /<name> answers server.pages[name] with an ETag (when server.etags
+    # is set) and a Last-Modified header, or 304 when the request's
+    # validators still match
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        body = server.pages[self.path.lstrip("/")]
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        server.requests.append(dict(self.headers))
+        if server.etags:
+            fresh = self.headers.get("If-None-Match") == etag
+        else:
+            fresh = self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        self.send_response(304 if fresh else 200)
+        if server.etags:
+            self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", "0" if fresh else str(len(body)))
+        self.end_headers()
+        if not fresh:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def pages():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Pages)
+    server.daemon_threads = True
+    server.pages = {}
+    server.requests = []
+    server.etags = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _fetch(cache, pages, season, final=False):
+    items = [("nfl", season, f"{pages.base}/{season}", final)]
+    return cache.fetch_all(Fetcher(retries=0, interval=0), items)[0]
+
+
+@pytest.mark.parametrize("etags", [True, False])
+def test_not_modified_returns_the_cached_page(tmp_path, pages, etags):
+    pages.etags = etags
+    pages.pages["2023"] = b"first version"
+    cache = RawCache(str(tmp_path))
+    assert _fetch(cache, pages, 2023) == b"first version"
+    assert cache.last[0][0] == "miss"
+
+    assert _fetch(cache, pages, 2023) == b"first version"
+    assert cache.last[0][0] == "revalidated"
+    header = "If-None-Match" if etags else "If-Modified-Since"
+    assert header in pages.requests[-1]
+
+    # a restarted run revalidates against the saved index
+    cache = RawCache(str(tmp_path))
+    assert _fetch(cache, pages, 2023) == b"first version"
+    assert cache.stats == {"hit": 0, "revalidated": 1, "miss": 0}
+
+    if etags:
+        pages.pages["2023"] = b"second version"
+        assert _fetch(cache, pages, 2023) == b"second version"
+        assert cache.last[0][0] == "miss"
+
+
+def test_finished_seasons_skip_the_network(tmp_path, pages):
+    pages.pages["2019"] = b"old season"
+    cache = RawCache(str(tmp_path))
+    _fetch(cache, pages, 2019, final=True)
+    assert _fetch(cache, pages, 2019, final=True) == b"old season"
+    assert len(pages.requests) == 1
+    assert cache.stats["hit"] == 1
+
+
+def test_evict_keeps_the_cache_under_max_bytes(tmp_path, pages):
+    cache = RawCache(str(tmp_path), max_bytes=250)
+    for season in range(2016, 2021):
+        pages.pages[str(season)] = str(season).encode() * 25
+        _fetch(cache, pages, season, final=True)
+
+    objects = os.listdir(tmp_path / "objects")
+    assert sum(os.path.getsize(tmp_path / "objects" / o) for o in objects) <= 250
+    assert sum(entry["size"] for entry in cache.index.values()) <= 250
+    # the least recently used pages went first
+    assert sorted(int(k.split("/")[1]) for k in cache.index) == [2019, 2020]
+    assert len(objects) == len(cache.index)
+
+    _fetch(cache, pages, 2016, final=True)
+    assert cache.last[0][0] == "miss"
+
+
+def test_cache_evict_command(tmp_path, pages, capsys):
+    cache = RawCache(str(tmp_path))
+    for season in range(2016, 2021):
+        pages.pages[str(season)] = str(season).encode() * 25
+        _fetch(cache, pages, season, final=True)
+
+    main(["cache", "evict", "--root", str(tmp_path), "--max-bytes", "150"])
+    assert "1 pages" in capsys.readouterr().out
+    cache = RawCache(str(tmp_path))
+    assert [k.split("/")[1] for k in cache.index] == ["2020"]
+    assert os.listdir(tmp_path / "objects") == [cache.index[k]["hash"] for k in cache.index]
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from scrapers.changes import diff_games
+from scrapers.output import as_schema, read_output, write_output
+
+
+def test_parquet_round_trip_has_no_changes(tmp_path, mlb_season):
+    games, dtypes = mlb_season()
+    path = str(tmp_path / "odds")
+    write_output(games, path, "parquet", "mlb", dtypes)
+    # dates come back as datetime.date and names as categories
+    stored = read_output(path, "parquet")
+
+    # as spliced by an incremental run: old dates next to fresh strings
+    mixed = pd.concat([stored.iloc[:30], games.iloc[30:]], ignore_index=True)
+    assert mixed["date"].map(type).nunique() == 2
+
+    for previous in (stored, mixed, as_schema(stored, dtypes)):
+        diff = diff_games(previous, games)
+        assert [len(diff[op]) for op in ("insert", "update", "delete")] == [0, 0, 0]
+
+    changed = games.copy()
+    changed.loc[3, "h_ML_cl"] = 999
+    diff = diff_games(stored, changed)
+    assert [len(diff[op]) for op in ("insert", "update", "delete")] == [0, 1, 0]
+    assert diff["changed"].columns[diff["changed"].iloc[0]].tolist() == ["h_ML_cl"]
@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+from cli import main
+
+SCRAPE = [
+    "scrape", "--sport", "nhl", "--start", "2015", "--end", "2017", "--filename", "nhl",
+    "--no-cache", "--parse-workers", "1", "--http-retries", "0", "--work-dir", "work",
+]
+
+
+def test_resume_skips_checkpointed_seasons(site):
+    pages = [site.add("nhl", season) for season in (2015, 2016, 2017)]
+    site.fail[pages[1]] = 1
+    with pytest.raises(RuntimeError, match=r"\[2016\] failed to download"):
+        main(SCRAPE)
+    with open("work/nhl/manifest.json") as f:
+        assert sorted(json.load(f)["seasons"]) == ["2015", "2017"]
+    assert not os.path.exists("data/nhl.json")
+
+    site.hits.clear()
+    main([*SCRAPE, "--resume"])
+    # only the failed season is downloaded again
+    assert dict(site.hits) == {pages[1]: 1}
+    with open("data/nhl.json") as f:
+        games = json.load(f)
+    assert sorted({g["season"] for g in games}) == [2015, 2016, 2017]
+    assert len(games) == 120
+    assert not os.path.exists("work/nhl")
+
+
+def test_without_resume_earlier_work_is_discarded(site):
+    pages = [site.add("nhl", season) for season in (2015, 2016, 2017)]
+    site.fail[pages[2]] = 1
+    with pytest.raises(RuntimeError):
+        main(SCRAPE)
+
+    site.hits.clear()
+    main(SCRAPE)
+    assert sorted(site.hits) == sorted(pages)
+    assert not os.path.exists("work/nhl")
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from benchmarks import synthetic
+from scrapers.clean import clean_column
+
+
+def test_clean_column_masks():
+    col = pd.Series(["-110", "pk", "abc", None, "NL"])
+    out, counts, masks = clean_column(col, numeric=True)
+    assert counts == {"blacklisted": 2, "coerced": 1}
+    assert masks["blacklisted"].tolist() == [False, True, False, False, True]
+    assert masks["coerced"].tolist() == [False, False, True, False, False]
+    assert out[:2].tolist() == [-110.0, 0.0]
+    assert out[2:4].isna().all()
+
+
+def test_unreadable_cells_are_quarantined_with_their_page_row(make_scraper):
+    table = synthetic.nhl_table(2016, 40)
+    # page row 7 is the away row of the fourth game (rows 1 and 2 are the first)
+    column = table.columns[14]
+    table.loc[7, column] = "abc"
+    scraper = make_scraper("nhl", table)
+    games, report = scraper._season_schema(b"", 2016)
+
+    cleaned = report["cleaned"]["OU_cl_line"]
+    assert cleaned["coerced"] == 1
+    assert cleaned["coerced_rows"] == [7]
+    quarantine = report["quarantine"]
+    flagged = quarantine[quarantine["reason"].str.contains("unreadable OU_cl_line")]
+    assert flagged["page_row"].tolist() == [7]
+    assert not flagged["dropped"].any()
+    assert len(games) == 40
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from scrapers.compact import GameTable
+
+
+@pytest.fixture
+def compact(mlb_season):
+    games, dtypes = mlb_season(300)
+    return games, GameTable(games, dtypes)
+
+
+def test_lookup_by_date_and_team(compact):
+    games, table = compact
+    team = games["h_name"].iloc[0]
+    date = games["date"].iloc[0]
+    expected = games[((games["h_name"] == team) | (games["a_name"] == team)) & (games["date"] == date)]
+    found = table.lookup(date=date, team=team)
+    assert [g.h_ML_cl for g in found] == expected["h_ML_cl"].tolist()
+    assert table.lookup(team="Nobody") == []
+
+
+def test_to_pandas_shares_every_buffer(compact):
+    _, table = compact
+    df = table.to_pandas()
+    for col in table.columns:
+        array = df[col].array
+        if col in table._codes:
+            assert np.shares_memory(array._codes, table._codes[col][0]), col
+        else:
+            values, mask = table._numbers[col]
+            data = array._data if mask is not None else df[col].to_numpy()
+            assert np.shares_memory(data, values), col
@@ -0,0 +1,161 @@
+import http.server
+import threading
+import time
+from collections import Counter
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from scrapers.fetch import Fetcher, _retry_after
+
+
+class _Stub(http.server.BaseHTTPRequestHandler):
+    # GET /<key>?delay=<s>&fail=<n>&status=<code>&retry_after=<value>: waits
+    # `delay` seconds, answers `status` (default 503) to the first `fail`
+    # requests for `key`, then 200 with the key as body
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        with server.lock:
+            server.hits[url.path] += 1
+            hit = server.hits[url.path]
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            server.starts.append(time.monotonic())
+        try:
+            time.sleep(float(query.get("delay", 0)))
+        finally:
+            with server.lock:
+                server.active -= 1
+        if hit <= int(query.get("fail", 0)):
+            status = int(query.get("status", 503))
+            body = b"no"
+        else:
+            status = 200
+            body = url.path.encode()
+        self.send_response(status)
+        if status != 200 and "retry_after" in query:
+            self.send_header("Retry-After", query["retry_after"])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits = Counter()
+    server.active = 0
+    server.peak = 0
+    server.starts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_all_keeps_url_order(stub):
+    # later urls answer first
+    urls = [f"{stub.base}/{i}?delay={0.05 * (5 - i)}" for i in range(6)]
+    fetcher = Fetcher(max_workers=6, per_host=6, interval=0)
+    responses = fetcher.fetch_all(urls)
+    assert [r.text for r in responses] == [f"/{i}" for i in range(6)]
+
+
+def test_per_host_concurrency_limit(stub):
+    urls = [f"{stub.base}/{i}?delay=0.1" for i in range(8)]
+    fetcher = Fetcher(max_workers=8, per_host=2, interval=0)
+    fetcher.fetch_all(urls)
+    assert stub.peak == 2
+
+
+def test_limits_are_per_host(stub):
+    # the same server under two host names gets a limit for each
+    other = stub.base.replace("127.0.0.1", "localhost")
+    urls = [f"{base}/{i}?delay=0.2" for i in range(4) for base in (stub.base, other)]
+    fetcher = Fetcher(max_workers=8, per_host=2, interval=0)
+    fetcher.fetch_all(urls)
+    assert stub.peak == 4
+
+
+def test_per_host_interval(stub):
+    urls = [f"{stub.base}/{i}" for i in range(4)]
+    fetcher = Fetcher(max_workers=4, per_host=4, interval=0.1)
+    fetcher.fetch_all(urls)
+    gaps = [b - a for a, b in zip(stub.starts, stub.starts[1:])]
+    assert min(gaps) >= 0.08
+
+
+def test_retries_until_success(stub):
+    fetcher = Fetcher(retries=3, backoff=0.01, interval=0)
+    r = fetcher.get(f"{stub.base}/flaky?fail=2")
+    assert r.text == "/flaky"
+    assert stub.hits["/flaky"] == 3
+
+
+def test_gives_up_after_retries(stub):
+    fetcher = Fetcher(retries=2, backoff=0.01, interval=0)
+    with pytest.raises(requests.HTTPError):
+        fetcher.get(f"{stub.base}/down?fail=99")
+    assert stub.hits["/down"] == 3
+
+
+def test_client_errors_are_not_retried(stub):
+    fetcher = Fetcher(retries=3, backoff=0.01, interval=0)
+    with pytest.raises(requests.HTTPError):
+        fetcher.get(f"{stub.base}/missing?fail=1&status=404")
+    assert stub.hits["/missing"] == 1
+
+
+def test_timeouts_are_retried(stub):
+    fetcher = Fetcher(retries=1, backoff=0.01, interval=0, timeout=0.1)
+    with pytest.raises(requests.Timeout):
+        fetcher.get(f"{stub.base}/hang?delay=0.5")
+    assert stub.hits["/hang"] == 2
+
+
+def test_failed_urls_in_place_with_return_exceptions(stub):
+    fetcher = Fetcher(retries=0, interval=0)
+    urls = [f"{stub.base}/ok", f"{stub.base}/bad?fail=1", f"{stub.base}/ok2"]
+    responses = fetcher.fetch_all(urls, return_exceptions=True)
+    assert responses[0].text == "/ok"
+    assert isinstance(responses[1], requests.HTTPError)
+    assert responses[2].text == "/ok2"
+
+
+def test_honours_retry_after(stub):
+    # backoff alone would retry almost at once
+    fetcher = Fetcher(retries=1, backoff=0.001, interval=0)
+    start = time.monotonic()
+    r = fetcher.get(f"{stub.base}/busy?fail=1&status=429&retry_after=1")
+    assert r.status_code == 200
+    assert time.monotonic() - start >= 0.9
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_retry_after_values():
+    assert _retry_after(_Response({})) is None
+    assert _retry_after(_Response({"Retry-After": "3"})) == 3.0
+    assert _retry_after(_Response({"Retry-After": "soon"})) is None
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    wait = _retry_after(_Response({"Retry-After": format_datetime(when, usegmt=True)}))
+    assert 25 <= wait <= 30
+    past = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert _retry_after(_Response({"Retry-After": format_datetime(past, usegmt=True)})) == 0.0
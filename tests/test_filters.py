@@ -0,0 +1,38 @@
+import pandas as pd
+
+from benchmarks import synthetic
+
+
+def test_filter_matching_no_games(make_scraper):
+    table = synthetic.mlb_table(2016, 50)
+    for kwargs in (
+        {"teams": ["Nobody"]},
+        {"dates": ("2016-01-01", "2016-01-31")},
+        {"teams": ["Nobody"], "columns": ["h_ML_cl"], "enrich": True},
+    ):
+        scraper = make_scraper("mlb", table, **kwargs)
+        games, report = scraper._season_schema(b"", 2016)
+        assert games.empty
+        assert report["quarantine"].empty
+        assert report["warnings"] == {}
+        assert list(games.columns[:4]) == ["season", "date", "a_name", "h_name"]
+
+
+def test_filter_matches_full_output(make_scraper):
+    table = synthetic.mlb_table(2016, 200)
+    full, _ = make_scraper("mlb", table)._season_schema(b"", 2016)
+    team = full["h_name"].iloc[0]
+    dates = sorted(full["date"].unique())
+    first, last = dates[5], dates[40]
+    narrow, _ = make_scraper(
+        "mlb", table, columns=["h_ML_cl"], teams=[team], dates=(first, last)
+    )._season_schema(b"", 2016)
+    expected = full[
+        ((full["h_name"] == team) | (full["a_name"] == team))
+        & (full["date"] >= first)
+        & (full["date"] <= last)
+    ]
+    assert len(narrow)
+    pd.testing.assert_frame_equal(
+        narrow, expected[list(narrow.columns)].reset_index(drop=True), check_dtype=False
+    )
@@ -0,0 +1,38 @@
+from benchmarks import synthetic
+from scrapers.output import read_manifest, read_output, write_manifest, write_output
+from scrapers.sportsbookreview import OddsScraper
+
+
+def _scraper(pages):
+    # serves pages[season] as that season's download
+    scraper = OddsScraper("mlb", sorted(pages))
+    tables = {str(s).encode(): synthetic.mlb_table(s, 40) for s in pages}
+
+    def download(seasons, return_exceptions=False):
+        contents = [pages[s] for s in seasons]
+        for season, content in zip(seasons, contents):
+            scraper._downloaded(season, content)
+        return contents
+
+    scraper._download = download
+    scraper._read = lambda content: tables[content.split(b":")[0]]
+    return scraper
+
+
+def test_incremental_parquet_keeps_one_date_type(tmp_path):
+    path = str(tmp_path / "odds")
+    scraper = _scraper({2016: b"2016", 2017: b"2017"})
+    write_output(scraper.driver(), path, "parquet", "mlb", scraper.dtypes)
+    write_manifest(path, "mlb", scraper.hashes)
+
+    # only 2017's page changed
+    scraper = _scraper({2016: b"2016", 2017: b"2017:v2"})
+    data, stale = scraper.update(read_output(path, "parquet"), read_manifest(path, "mlb"))
+    assert stale == [2017]
+    assert data["date"].map(type).unique().tolist() == [str]
+    assert data["h_name"].map(type).unique().tolist() == [str]
+
+    write_output(data, path, "parquet", "mlb", scraper.dtypes)
+    stored = read_output(path, "parquet")
+    assert stored["date"].notna().all()
+    assert sorted(stored["season"].unique()) == [2016, 2017]
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from scrapers.metrics import enrich
+from scrapers.sports import get_sport
+
+
+def _games():
+    # a push on the spread and the total, then a pick'em with no total posted
+    return pd.DataFrame({
+        "ML_H_cl_odds": [-150, -110],
+        "ML_A_cl_odds": [130, -110],
+        "S_H_cl_line": [-3.0, 0.0],
+        "home_open_spread": [-2.5, 1.0],
+        "OU_cl_line": [45.0, 0.0],
+        "OU_op_line": [44.0, 41.5],
+        "home_final": [24, 20],
+        "away_final": [21, 17],
+    })
+
+
+def test_nfl_metric_values():
+    out = enrich(_games(), get_sport("nfl").metrics)
+    first, second = out.iloc[0], out.iloc[1]
+
+    # 150 / 250 and 100 / 230
+    assert first["ML_H_cl_prob"] == pytest.approx(0.6)
+    assert first["ML_A_cl_prob"] == pytest.approx(0.434783, abs=1e-6)
+    assert first["ML_cl_hold"] == pytest.approx(0.034783, abs=1e-6)
+    assert first["ML_H_cl_novig"] == pytest.approx(0.579832, abs=1e-6)
+    assert first["ML_A_cl_novig"] == pytest.approx(0.420168, abs=1e-6)
+    assert first["S_H_move"] == pytest.approx(-0.5)
+    assert first["OU_move"] == pytest.approx(1.0)
+    assert (first["margin"], first["total_score"]) == (3, 45)
+    assert (first["H_ATS"], first["OU_result"]) == (0, 0)
+
+    # 110 / 210 a side
+    assert second["ML_cl_hold"] == pytest.approx(0.047619, abs=1e-6)
+    assert second["ML_H_cl_novig"] == pytest.approx(0.5)
+    # the pick'em still grades, the missing total doesn't
+    assert second["S_H_move"] == pytest.approx(-1.0)
+    assert second["H_ATS"] == 1
+    assert pd.isna(second["OU_move"])
+    assert pd.isna(second["OU_result"])
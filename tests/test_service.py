@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+
+import scrapers.service
+from benchmarks import synthetic
+from scrapers.cache import RawCache
+from scrapers.service import OddsService
+from scrapers.sports import get_sport
+from scrapers.store import OddsStore
+
+
+class _Today:
+    value = date(2024, 9, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.value
+
+
+class _Service(OddsService):
+    # every season's page is a synthetic NHL table, served without a network
+    def _scraper(self, sport, season):
+        scraper = super()._scraper(sport, season)
+        page = str(season).encode()
+        table = synthetic.nhl_table(season, 30)
+
+        def download(seasons, return_exceptions=False):
+            for s in seasons:
+                scraper._downloaded(s, page)
+            return [page for _ in seasons]
+
+        scraper._download = download
+        scraper._read = lambda content: table
+        return scraper
+
+
+@pytest.fixture
+def today(monkeypatch):
+    monkeypatch.setattr(scrapers.service, "date", _Today)
+    monkeypatch.setattr(_Today, "value", date(2024, 9, 1))
+    return _Today
+
+
+def test_current_season_starts_per_sport():
+    september, october = date(2024, 9, 15), date(2024, 10, 20)
+    assert get_sport("nfl").current_season(september) == 2024
+    assert get_sport("nba").current_season(september) == 2023
+    assert get_sport("nhl").current_season(september) == 2023
+    assert get_sport("nba").current_season(october) == 2024
+    assert get_sport("mlb").current_season(date(2024, 2, 1)) == 2024
+
+
+def test_refresh_moves_on_to_a_new_season(tmp_path, today):
+    store = OddsStore(str(tmp_path / "odds.db"))
+    service = _Service(["nhl"], store=store, cache=RawCache(str(tmp_path / "src")))
+    assert service.refresh("nhl") == 30
+    assert service.status_snapshot()["nhl"]["season"] == 2023
+
+    today.value = date(2024, 10, 5)
+    assert service.refresh("nhl") == 30
+    assert service.status_snapshot()["nhl"]["season"] == 2024
+    assert service.latest("nhl")["season"].unique().tolist() == [2024]
+    # the finished season is kept as it was last refreshed
+    assert sorted(store.games("nhl")["season"].unique()) == [2023, 2024]
+    assert service.refresh("nhl") == 0
+    store.close()
+
+
+def test_pinned_season_stays(tmp_path, today):
+    service = _Service(["nhl"], season=2023, cache=RawCache(str(tmp_path / "src")))
+    service.refresh("nhl")
+    today.value = date(2024, 10, 5)
+    service.refresh("nhl")
+    assert service.status_snapshot()["nhl"]["season"] == 2023
+    assert service.scrapers["nhl"].seasons == [2023]
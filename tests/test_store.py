@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from cli import main
+from scrapers.store import OddsStore
+
+
+def test_projection_upsert_keeps_other_columns(tmp_path, mlb_season):
+    store = OddsStore(str(tmp_path / "odds.db"))
+    full, dtypes = mlb_season()
+    store.upsert("mlb", full, dtypes)
+
+    narrow, _ = mlb_season(columns=["h_ML_cl"])
+    narrow["h_ML_cl"] = 999
+    store.upsert("mlb", narrow)
+
+    games = store.games("mlb")
+    assert len(games) == len(full)
+    assert games["a_final"].notna().all()
+    assert (games["h_ML_cl"] == 999).all()
+    store.close()
+
+
+def test_enrich_into_existing_store_adds_columns(tmp_path, mlb_season):
+    store = OddsStore(str(tmp_path / "odds.db"))
+    plain, dtypes = mlb_season()
+    store.upsert("mlb", plain, dtypes)
+
+    enriched, dtypes = mlb_season(enrich=True)
+    store.upsert("mlb", enriched, dtypes)
+
+    games = store.games("mlb")
+    assert len(games) == len(plain)
+    assert games["ML_H_cl_prob"].notna().any()
+    kinds = {r[1]: r[2] for r in store.conn.execute('PRAGMA table_info("mlb")')}
+    assert kinds["ML_H_cl_prob"] == "NUMERIC"
+    store.close()
+
+
+def test_query_fails_on_missing_db(tmp_path):
+    path = tmp_path / "missing.db"
+    with pytest.raises(FileNotFoundError):
+        main(["query", "--sport", "mlb", "--db", str(path)])
+    assert not path.exists()
+
+
+def test_read_only_store_cannot_write(tmp_path, mlb_season):
+    path = str(tmp_path / "odds.db")
+    games, dtypes = mlb_season()
+    writer = OddsStore(path)
+    writer.upsert("mlb", games, dtypes)
+    writer.close()
+    store = OddsStore(path, read_only=True)
+    assert len(store.games("mlb")) == len(games)
+    with pytest.raises(sqlite3.OperationalError):
+        store.upsert("mlb", games, dtypes)
+    store.close()
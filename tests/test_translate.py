@@ -0,0 +1,22 @@
+import pandas as pd
+
+from benchmarks import synthetic
+from scrapers.translate import Translator
+
+
+def test_ysports_run_has_no_unmapped_names(make_scraper):
+    for sport, table in (
+        ("nfl", synthetic.nfl_table(2016, 100)),
+        ("nhl", synthetic.nhl_table(2016, 100)),
+        ("mlb", synthetic.mlb_table(2016, 100)),
+    ):
+        scraper = make_scraper(sport, table, naming="ysports")
+        scraper._season_schema(b"", 2016)
+        assert scraper.unmapped_names() == [], sport
+
+
+def test_unknown_names_are_unmapped():
+    translator = Translator("nfl", "ysports")
+    out = translator.translate(pd.Series(["TampaBay", "Dallas", "Gotham"]))
+    assert out.tolist() == ["Tampa Bay", "Dallas", "Gotham"]
+    assert translator.unmapped == {"Gotham"}